@@ -1,9 +1,117 @@
 import pytest
-import requests
 import random
+import threading
 import uuid
 
-BASE_URL = "https://qa-internship.avito.com"
+from utils.api_client import APIClient, BASE_URL
+from utils.compression import TransferStats
+from utils.differential import DEFAULT_THRESHOLD, DiffRecorder, DifferentialAPIClient
+from utils.fault_proxy import FaultProxy
+from utils.stub_service import StubItemService
+from utils.warmup import DEFAULT_WARMUP_TIMEOUT, ConnectionWarmer, DNSCache, create_session
+
+pytest_plugins = ["pytester", "utils.flaky", "utils.streaming_report"]
+
+warmup_key = pytest.StashKey()
+transfer_stats_key = pytest.StashKey()
+diff_recorder_key = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--base-url", default=BASE_URL,
+        help="Адрес тестируемого сервиса (по умолчанию BASE_URL)"
+    )
+    parser.addoption(
+        "--warmup-connections", type=int, default=4,
+        help="Сколько соединений к --base-url открыть при старте сессии (0 - без прогрева)"
+    )
+    parser.addoption(
+        "--warmup-timeout", type=float, default=DEFAULT_WARMUP_TIMEOUT,
+        help="Таймаут первого запроса и каждого соединения при прогреве, секунды"
+    )
+    parser.addoption(
+        "--compression", action="store_true", default=False,
+        help="Запрашивать сжатые ответы (gzip/deflate, br при наличии brotli)"
+    )
+    parser.addoption(
+        "--transfer-stats", action="store_true", default=False,
+        help="Считать байты ответов на проводе и после декодирования (включено с --compression)"
+    )
+    parser.addoption(
+        "--compare-url", default=None,
+        help="Второй инстанс сервиса: каждый вызов api_client дублируется в него и сравнивается"
+    )
+    parser.addoption(
+        "--compare-threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Допустимый рост p50/p95 у --compare-url относительно --base-url (доля)"
+    )
+    parser.addoption(
+        "--compare-report", default=None,
+        help="Файл для JSON-отчёта сравнения двух инстансов"
+    )
+
+
+def pytest_sessionstart(session):
+    """
+    Прогрев в фоне: DNS, пул соединений и TLS-сессия к --base-url готовятся,
+    пока pytest собирает тесты. Каждый xdist-воркер прогревает свой пул.
+    """
+    config = session.config
+    if config.getoption("--compression") or config.getoption("--transfer-stats"):
+        config.stash[transfer_stats_key] = TransferStats()
+    compare_url = session.config.getoption("--compare-url")
+    if compare_url:
+        session.config.stash[diff_recorder_key] = DiffRecorder(
+            session.config.getoption("--base-url"), compare_url,
+            session.config.getoption("--compare-threshold")
+        )
+    connections = session.config.getoption("--warmup-connections")
+    http_session = create_session(pool_size=max(10, connections))
+    warmer = None
+    if connections > 0:
+        dns_cache = DNSCache().install()
+        base_url = session.config.getoption("--base-url")
+        warmer = ConnectionWarmer(http_session, base_url, connections, dns_cache,
+                                  session.config.getoption("--warmup-timeout"))
+        thread = threading.Thread(target=warmer.run, daemon=True)
+        thread.start()
+        session.config.stash[warmup_key] = (http_session, warmer, thread, dns_cache)
+    else:
+        session.config.stash[warmup_key] = (http_session, None, None, None)
+
+
+def pytest_sessionfinish(session):
+    recorder = session.config.stash.get(diff_recorder_key, None)
+    report_path = session.config.getoption("--compare-report")
+    if recorder is not None and report_path:
+        recorder.write(report_path)
+    http_session, warmer, thread, dns_cache = session.config.stash.get(warmup_key, (None,) * 4)
+    if dns_cache is not None:
+        dns_cache.uninstall()
+    if http_session is not None:
+        http_session.close()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    http_session, warmer, thread, dns_cache = config.stash.get(warmup_key, (None,) * 4)
+    if warmer is not None and (not thread.is_alive() or warmer.report.error):
+        terminalreporter.write_sep("-", "connection warm-up")
+        for line in warmer.report.lines():
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"  dns cache: {dns_cache.hits} hits, {dns_cache.misses} misses")
+
+    transfer_stats = config.stash.get(transfer_stats_key, None)
+    if transfer_stats is not None and transfer_stats.endpoints:
+        terminalreporter.write_sep("-", "payload transfer")
+        for line in transfer_stats.lines():
+            terminalreporter.write_line(line)
+
+    recorder = config.stash.get(diff_recorder_key, None)
+    if recorder is not None:
+        terminalreporter.write_sep("-", "differential comparison")
+        for line in recorder.lines():
+            terminalreporter.write_line(line)
 
 
 def generate_seller_id():
@@ -12,9 +120,9 @@ def generate_seller_id():
 
 
 @pytest.fixture(scope="session")
-def base_url():
+def base_url(request):
     """Базовый URL API"""
-    return BASE_URL
+    return request.config.getoption("--base-url")
 
 
 @pytest.fixture(scope="session")
@@ -47,55 +155,72 @@ def valid_item_data(new_seller_id):
     }
 
 
+@pytest.fixture(scope="session")
+def http_session(request):
+    """
+    Общая HTTP-сессия с прогретым пулом соединений.
+    Ждёт завершения фонового прогрева, запущенного в pytest_sessionstart,
+    но не дольше трёх --warmup-timeout.
+    """
+    http_session, warmer, thread, dns_cache = request.config.stash[warmup_key]
+    if thread is not None:
+        warmer.wait(thread)
+    return http_session
+
+
+@pytest.fixture(scope="session")
+def transfer_stats(request):
+    """Учёт байтов за всю сессию (None без --compression и --transfer-stats)"""
+    return request.config.stash.get(transfer_stats_key, None)
+
+
+@pytest.fixture
+def api_client(request, base_url, http_session, transfer_stats):
+    """
+    API клиент с базовыми методами.
+    С опцией --compare-url каждый вызов дублируется во второй инстанс.
+    """
+    compression = request.config.getoption("--compression")
+    client = APIClient(
+        base_url, session=http_session,
+        compression=compression,
+        transfer_stats=transfer_stats
+    )
+    recorder = request.config.stash.get(diff_recorder_key, None)
+    if recorder is None:
+        yield client
+        return
+
+    candidate = APIClient(
+        request.config.getoption("--compare-url"), session=http_session,
+        compression=compression
+    )
+    client = DifferentialAPIClient(client, candidate, recorder)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def stub_service():
+    """Локальная заглушка сервиса объявлений для проверки инструментов без сети"""
+    with StubItemService() as service:
+        yield service
+
+
+@pytest.fixture
+def fault_proxy(base_url):
+    """
+    Прокси с внедрением сбоев между клиентом и base_url.
+    Правила задаются в тесте через add_rule() или scenario().
+    """
+    with FaultProxy(base_url) as proxy:
+        yield proxy
+
+
 @pytest.fixture
-def api_client(base_url):
-    """API клиент с базовыми методами"""
-
-    class APIClient:
-        def __init__(self, base_url):
-            self.base_url = base_url
-            self.headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-
-        def create_item(self, data):
-            """POST /api/1/item - Создать объявление"""
-            return requests.post(
-                f"{self.base_url}/api/1/item",
-                json=data,
-                headers=self.headers
-            )
-
-        def get_item(self, item_id):
-            """GET /api/1/item/{id} - Получить объявление по ID"""
-            return requests.get(
-                f"{self.base_url}/api/1/item/{item_id}",
-                headers={"Accept": "application/json"}
-            )
-
-        def get_seller_items(self, seller_id):
-            """GET /api/1/{sellerID}/item - Получить все объявления продавца"""
-            return requests.get(
-                f"{self.base_url}/api/1/{seller_id}/item",
-                headers={"Accept": "application/json"}
-            )
-
-        def get_statistic(self, item_id, version=1):
-            """GET /api/{version}/statistic/{id} - Получить статистику"""
-            return requests.get(
-                f"{self.base_url}/api/{version}/statistic/{item_id}",
-                headers={"Accept": "application/json"}
-            )
-
-        def delete_item(self, item_id):
-            """DELETE /api/2/item/{id} - Удалить объявление"""
-            return requests.delete(
-                f"{self.base_url}/api/2/item/{item_id}",
-                headers={"Accept": "application/json"}
-            )
-
-    return APIClient(base_url)
+def proxied_api_client(fault_proxy):
+    """API клиент, который ходит в сервис через fault_proxy"""
+    return APIClient(fault_proxy.url)
 
 
 @pytest.fixture
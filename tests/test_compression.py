@@ -0,0 +1,115 @@
+import gzip
+import zlib
+
+import pytest
+import requests
+
+from utils.api_client import APIClient
+from utils.compression import StreamDecoder, TransferStats, accept_encoding, brotli
+from utils.stub_service import StubItemService
+
+
+@pytest.fixture(scope="module")
+def compressing_stub():
+    """Заглушка сервиса, сжимающая ответы по Accept-Encoding"""
+    with StubItemService(compression=True) as service:
+        yield service
+
+
+def create_items(client, seller_id, count):
+    for i in range(count):
+        response = client.create_item({
+            "sellerID": seller_id,
+            "name": f"Объявление с длинным названием {i}",
+            "price": i,
+            "statistics": {"likes": 0, "viewCount": 0, "contacts": 0}
+        })
+        assert response.status_code == 200
+
+
+class TestCompression:
+    """
+    Тесты согласования сжатия и учёта байтов (utils/compression.py)
+    """
+
+    @pytest.mark.parametrize("compress, encoding", [
+        (gzip.compress, "gzip"),
+        (zlib.compress, "deflate"),
+        (lambda data: zlib.compress(data)[2:-4], "deflate"),
+    ])
+    def test_stream_decoder(self, compress, encoding):
+        """Потоковый декодер восстанавливает тело, поданное мелкими кусками"""
+        payload = b'{"name": "item"}' * 500
+        encoded = compress(payload)
+        decoder = StreamDecoder(encoding)
+
+        decoded = b"".join(decoder.decompress(encoded[i:i + 7]) for i in range(0, len(encoded), 7))
+        decoded += decoder.flush()
+
+        assert decoded == payload
+
+    def test_accept_encoding_is_opt_in(self):
+        """По умолчанию заголовок requests не меняется, с compression добавляется br"""
+        assert accept_encoding(False) is None
+        assert "Accept-Encoding" not in APIClient("http://localhost").headers
+        assert "gzip" in accept_encoding(True)
+        if brotli is not None:
+            assert "br" in accept_encoding(True)
+
+    def test_compressed_listing_is_accounted(self, compressing_stub, new_seller_id):
+        """Сжатый ответ декодируется, а на проводе байтов меньше, чем после декодирования"""
+        stats = TransferStats()
+        client = APIClient(compressing_stub.url, compression=True, transfer_stats=stats)
+        create_items(client, new_seller_id, 30)
+
+        response = client.get_seller_items(new_seller_id)
+
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] in ("gzip", "br")
+        assert len(response.json()) == 30
+        listing = stats.endpoints["get_seller_items"]
+        assert listing["compressed"] == 1
+        assert listing["wire_bytes"] < listing["decoded_bytes"]
+
+    def test_requests_default_encoding(self, compressing_stub, new_seller_id):
+        """Без compression=True клиент согласует gzip/deflate, как requests по умолчанию"""
+        stats = TransferStats()
+        client = APIClient(compressing_stub.url, transfer_stats=stats)
+        create_items(client, new_seller_id, 30)
+
+        response = client.get_seller_items(new_seller_id)
+        plain = APIClient(compressing_stub.url).get_seller_items(new_seller_id)
+
+        assert response.request.headers["Accept-Encoding"] == "gzip, deflate"
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.json() == plain.json()
+        listing = stats.endpoints["get_seller_items"]
+        assert listing["wire_bytes"] < listing["decoded_bytes"]
+        assert plain.headers["Content-Encoding"] == "gzip"
+
+    def test_streaming_path_reuses_connection(self, compressing_stub, new_seller_id):
+        """Потоковое чтение возвращает соединение в пул, тело доступно через .json()"""
+        session = requests.Session()
+        client = APIClient(compressing_stub.url, session=session, compression=True,
+                           transfer_stats=TransferStats())
+        create_items(client, new_seller_id, 3)
+
+        for _ in range(3):
+            response = client.get_seller_items(new_seller_id)
+            assert len(response.json()) == 3
+        pools = session.get_adapter(compressing_stub.url).poolmanager.pools
+        [pool] = [pools[key] for key in pools.keys()]
+        assert pool.num_connections == 1
+        assert pool.pool.qsize() == pool.pool.maxsize
+        session.close()
+
+    def test_server_ignoring_accept_encoding_is_flagged(self, stub_service, new_seller_id):
+        """Крупный несжатый ответ на запрос со сжатием отмечается в отчёте"""
+        stats = TransferStats()
+        client = APIClient(stub_service.url, compression=True, transfer_stats=stats)
+        create_items(client, new_seller_id, 30)
+
+        client.get_seller_items(new_seller_id)
+
+        assert stats.endpoints["get_seller_items"]["ignored"] == 1
+        assert "uncompressed despite Accept-Encoding" in "\n".join(stats.lines())
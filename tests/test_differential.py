@@ -0,0 +1,163 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils.api_client import APIClient
+from utils.differential import DiffRecorder, DifferentialAPIClient, diff_paths, normalize
+from utils.fault_proxy import FaultProxy
+from utils.stub_service import StubItemService
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class RepricingStubService(StubItemService):
+    """«Новая сборка», которая отдаёт объявление с изменённой ценой"""
+
+    def get_item(self, item_id):
+        item = super().get_item(item_id)
+        return dict(item, price=item["price"] + 1) if item else item
+
+
+class NoIdStubService(StubItemService):
+    """Не возвращает id созданного объявления ни в каком виде"""
+
+    def add_item(self, data):
+        super().add_item(data)
+        return {"status": "ok"}
+
+
+@pytest.fixture
+def candidate_stub():
+    with StubItemService() as service:
+        yield service
+
+
+@pytest.fixture
+def recorder(stub_service, candidate_stub):
+    return DiffRecorder(stub_service.url, candidate_stub.url)
+
+
+def make_client(baseline_url, candidate_url, recorder):
+    return DifferentialAPIClient(APIClient(baseline_url), APIClient(candidate_url), recorder)
+
+
+class TestDifferential:
+    """
+    Тесты сравнения двух инстансов сервиса (utils/differential.py)
+    """
+
+    def test_normalize_ignores_ids_and_order(self):
+        """id, createdAt и порядок элементов списка не влияют на сравнение"""
+        left = [{"id": "a", "createdAt": "1", "name": "x"}, {"id": "b", "name": "y"}]
+        right = [{"id": "c", "name": "y"}, {"id": "d", "createdAt": "2", "name": "x"}]
+
+        assert normalize(left) == normalize(right)
+
+    def test_diff_paths(self):
+        """Пути расхождений указывают на отличающиеся поля"""
+        left = {"price": 1, "statistics": {"likes": 1}, "tags": [1, 2]}
+        right = {"price": 2, "statistics": {"likes": 1, "contacts": 0}, "tags": [1]}
+
+        assert diff_paths(left, right) == ["$.price", "$.statistics.contacts", "$.tags[len 2 != 1]"]
+
+    def test_identical_instances_have_no_mismatches(self, stub_service, candidate_stub,
+                                                    recorder, valid_item_data):
+        """Одинаковые сборки не дают расхождений, id candidate подставляются автоматически"""
+        client = make_client(stub_service.url, candidate_stub.url, recorder)
+
+        item = client.create_item(valid_item_data).json()
+        assert client.get_item(item["id"]).status_code == 200
+        assert client.get_statistic(item["id"], version=2).status_code == 200
+        assert client.get_seller_items(valid_item_data["sellerID"]).status_code == 200
+        assert client.delete_item(item["id"]).status_code == 200
+        client.close()
+
+        report = recorder.report()
+        assert report["mismatches"] == []
+        assert {row["endpoint"] for row in report["latency"]} == {
+            "create_item", "get_item", "get_statistic_v2", "get_seller_items", "delete_item"
+        }
+
+    def test_body_mismatch_is_reported(self, stub_service, valid_item_data):
+        """Различие в теле ответа попадает в отчёт с путём до поля"""
+        with RepricingStubService() as candidate:
+            recorder = DiffRecorder(stub_service.url, candidate.url)
+            client = make_client(stub_service.url, candidate.url, recorder)
+            item = client.create_item(valid_item_data).json()
+            client.get_item(item["id"])
+            client.close()
+
+        assert recorder.mismatches == [{
+            "kind": "body", "paths": ["$[0].price"],
+            "endpoint": "get_item", "call": f"get_item({item['id']!r})"
+        }]
+        assert recorder.report()["regressed"]
+
+    def test_status_mismatch_and_latency_regression(self, stub_service, candidate_stub,
+                                                    valid_item_data):
+        """Другой статус и замедление candidate отмечаются как регрессия"""
+        with FaultProxy(candidate_stub.url) as proxy:
+            proxy.add_rule(endpoint="get_item", latency=0.05)
+            proxy.add_rule(endpoint="get_statistic", error_rate=1.0, error_status=500)
+            recorder = DiffRecorder(stub_service.url, proxy.url)
+            client = make_client(stub_service.url, proxy.url, recorder)
+            item = client.create_item(valid_item_data).json()
+            for _ in range(5):
+                client.get_item(item["id"])
+            response = client.get_statistic(item["id"])
+            client.close()
+
+        assert response.status_code == 200
+        assert [(m["endpoint"], m["baseline"], m["candidate"]) for m in recorder.mismatches] == [
+            ("get_statistic_v1", 200, 500)
+        ]
+        rows = {row["endpoint"]: row for row in recorder.latency()}
+        assert rows["get_item"]["regression"]
+        assert "REGRESSION" in "\n".join(recorder.lines())
+
+    def test_ids_mapped_from_status_text(self, valid_item_data):
+        """id берутся из текста status, если в ответе создания нет поля id"""
+        with StubItemService(status_response=True) as baseline, \
+                StubItemService(status_response=True) as candidate:
+            recorder = DiffRecorder(baseline.url, candidate.url)
+            client = make_client(baseline.url, candidate.url, recorder)
+            status = client.create_item(valid_item_data).json()["status"]
+            item_id = status.rsplit(" - ", 1)[1]
+            assert client.get_item(item_id).status_code == 200
+            assert client.delete_item(item_id).status_code == 200
+            client.close()
+
+        assert recorder.mismatches == []
+
+    def test_id_mapping_failure_is_reported(self, stub_service, valid_item_data):
+        """Несопоставимые ответы create_item дают явное расхождение id_mapping"""
+        with NoIdStubService() as candidate:
+            recorder = DiffRecorder(stub_service.url, candidate.url)
+            client = make_client(stub_service.url, candidate.url, recorder)
+            client.create_item(valid_item_data)
+            client.close()
+
+        assert [m["kind"] for m in recorder.mismatches] == ["body", "id_mapping"]
+        assert recorder.mismatches[1]["candidate"] == {"status": "ok"}
+        assert "id mapping failed" in "\n".join(recorder.lines())
+
+    def test_suite_runs_against_two_instances(self, stub_service, candidate_stub, tmp_path):
+        """Набор smoke-тестов с --compare-url пишет отчёт сравнения"""
+        report_path = tmp_path / "compare.json"
+
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "-m", "smoke", "-p", "no:cacheprovider",
+             "--base-url", stub_service.url, "--compare-url", candidate_stub.url,
+             "--compare-threshold", "100", "--compare-report", str(report_path)],
+            cwd=ROOT, capture_output=True, text=True, timeout=120
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert "differential comparison" in result.stdout
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        assert report["mismatches"] == []
+        assert report["regressed"] is False
+        assert {row["endpoint"] for row in report["latency"]} >= {"create_item", "get_item"}
@@ -0,0 +1,153 @@
+import socket
+import time
+
+import pytest
+import requests
+
+from utils.api_client import APIClient
+from utils.fault_proxy import FaultProxy, FaultRule, uniform
+
+
+@pytest.fixture
+def stub_proxy(stub_service):
+    """Прокси с внедрением сбоев перед локальной заглушкой сервиса"""
+    with FaultProxy(stub_service.url, seed=42) as proxy:
+        yield proxy
+
+
+@pytest.fixture
+def stub_client(stub_proxy):
+    return APIClient(stub_proxy.url, timeout=5)
+
+
+@pytest.fixture
+def stub_item(stub_service, valid_item_data):
+    return APIClient(stub_service.url).create_item(valid_item_data).json()
+
+
+class TestFaultProxy:
+    """
+    Тесты прокси с внедрением сбоев (utils/fault_proxy.py)
+    """
+
+    def test_forwards_without_rules(self, stub_client, stub_proxy, valid_item_data):
+        """Без правил прокси прозрачно передаёт запросы и ответы"""
+        response = stub_client.create_item(valid_item_data)
+
+        assert response.status_code == 200
+        item = response.json()
+        assert item["name"] == valid_item_data["name"]
+
+        get_response = stub_client.get_item(item["id"])
+        assert get_response.status_code == 200
+        assert get_response.json()[0]["id"] == item["id"]
+        assert stub_proxy.stats["forwarded"] == 2
+
+    def test_injects_latency(self, stub_client, stub_proxy, stub_item):
+        """Задержка применяется только к эндпоинту из правила"""
+        with stub_proxy.scenario(endpoint="get_item", latency=uniform(0.2, 0.3)):
+            started = time.monotonic()
+            assert stub_client.get_item(stub_item["id"]).status_code == 200
+            slow = time.monotonic() - started
+
+            started = time.monotonic()
+            assert stub_client.get_statistic(stub_item["id"]).status_code == 200
+            fast = time.monotonic() - started
+
+        assert slow >= 0.2
+        assert fast < 0.2
+
+    @pytest.mark.parametrize("status, retry_after", [(503, None), (500, None), (429, 3)])
+    def test_injects_error_status(self, stub_client, stub_proxy, stub_item, status, retry_after):
+        """Подменный ответ 5xx/429 возвращается без обращения к сервису"""
+        rule = FaultRule(endpoint="get_statistic", error_rate=1.0,
+                         error_status=status, retry_after=retry_after)
+        with stub_proxy.scenario(rule):
+            response = stub_client.get_statistic(stub_item["id"])
+
+        assert response.status_code == status
+        if retry_after is not None:
+            assert response.headers["Retry-After"] == str(retry_after)
+        assert stub_proxy.stats[f"status_{status}"] == 1
+        assert stub_proxy.stats["forwarded"] == 0
+
+    def test_injects_connection_reset(self, stub_client, stub_proxy, stub_item):
+        """Обрыв соединения приводит к ConnectionError на стороне клиента"""
+        with stub_proxy.scenario(endpoint="get_item", reset_rate=1.0):
+            with pytest.raises(requests.ConnectionError):
+                stub_client.get_item(stub_item["id"])
+
+        assert stub_proxy.stats["reset"] == 1
+        assert stub_client.get_item(stub_item["id"]).status_code == 200
+
+    def test_injects_truncated_body(self, stub_client, stub_proxy, stub_item):
+        """Обрезанное тело ответа приводит к ошибке чтения на стороне клиента"""
+        with stub_proxy.scenario(endpoint="get_item", truncate_rate=1.0):
+            with pytest.raises(requests.RequestException):
+                stub_client.get_item(stub_item["id"])
+
+        assert stub_proxy.stats["truncated"] == 1
+
+    def test_bandwidth_cap(self, stub_service, stub_client, stub_proxy, new_seller_id):
+        """Ограничение полосы растягивает передачу большого ответа"""
+        direct = APIClient(stub_service.url)
+        for i in range(20):
+            direct.create_item({
+                "sellerID": new_seller_id,
+                "name": f"Объявление {i}" * 10,
+                "price": i,
+                "statistics": {"likes": 0, "viewCount": 0, "contacts": 0}
+            })
+        size = len(direct.get_seller_items(new_seller_id).content)
+
+        with stub_proxy.scenario(endpoint="get_seller_items", bandwidth=size * 4):
+            started = time.monotonic()
+            response = stub_client.get_seller_items(new_seller_id)
+            elapsed = time.monotonic() - started
+
+        assert response.status_code == 200
+        assert len(response.json()) == 20
+        assert elapsed >= 0.2
+
+    def test_error_rate_is_reproducible_with_seed(self, stub_service, stub_item):
+        """Одинаковый seed даёт одинаковую последовательность сбоев"""
+        outcomes = []
+        for _ in range(2):
+            with FaultProxy(stub_service.url, seed=7) as proxy:
+                proxy.add_rule(endpoint="get_item", error_rate=0.5)
+                client = APIClient(proxy.url)
+                outcomes.append([client.get_item(stub_item["id"]).status_code for _ in range(20)])
+
+        assert outcomes[0] == outcomes[1]
+        assert set(outcomes[0]) == {200, 503}
+
+    def test_scenario_removes_rules_on_exit(self, stub_proxy):
+        """После выхода из scenario() правила снимаются"""
+        with stub_proxy.scenario(endpoint="get_item", error_rate=1.0):
+            assert len(stub_proxy.rules) == 1
+
+        assert stub_proxy.rules == []
+
+    def test_hung_upstream_returns_502(self):
+        """Сервис принимает соединение и молчит: прокси отвечает 502 по upstream_timeout"""
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(16)
+        try:
+            target = f"http://127.0.0.1:{listener.getsockname()[1]}"
+            with FaultProxy(target, upstream_timeout=0.2) as proxy:
+                started = time.perf_counter()
+                response = requests.get(f"{proxy.url}/api/1/item/x", timeout=5)
+                elapsed = time.perf_counter() - started
+                stats = dict(proxy.stats)
+        finally:
+            listener.close()
+
+        assert response.status_code == 502
+        assert elapsed < 2
+        assert stats == {"upstream_error": 1}
+
+    def test_unknown_endpoint_rejected(self):
+        """Правило с неизвестным эндпоинтом не создаётся"""
+        with pytest.raises(ValueError):
+            FaultRule(endpoint="unknown")
@@ -0,0 +1,178 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from utils.flaky import FlakinessDB, PROBES, classify, service_is_down
+from utils.http_server import BackgroundServer
+
+SAMPLE_TESTS = '''
+from pathlib import Path
+
+MARKER = Path(__file__).with_name("first_run_done")
+
+
+def test_stable():
+    assert True
+
+
+def test_flaky():
+    if not MARKER.exists():
+        MARKER.touch()
+        assert False, "fails only on the first run"
+
+
+def test_broken():
+    assert False
+'''
+
+
+class _RecoveringHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        owner = self.server.owner
+        with owner.lock:
+            owner.requests += 1
+            status = 503 if owner.requests <= owner.failing else 404
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class RecoveringService(BackgroundServer):
+    """Сервис, который отдаёт 503 на первые failing запросов, а потом поднимается"""
+
+    handler_class = _RecoveringHandler
+
+    def __init__(self, failing):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.failing = failing
+        self.requests = 0
+
+
+@pytest.fixture
+def sample_project(pytester):
+    pytester.makepyfile(test_sample=SAMPLE_TESTS)
+    return pytester
+
+
+def run_flaky(pytester, *args):
+    return pytester.runpytest("-p", "utils.flaky", "-p", "no:cacheprovider",
+                              "--flaky-db", str(pytester.path / "flaky.json"), *args)
+
+
+def read_db(pytester):
+    return json.loads((pytester.path / "flaky.json").read_text(encoding="utf-8"))
+
+
+class TestFlaky:
+    """
+    Тесты плагина выявления нестабильных тестов (utils/flaky.py)
+    """
+
+    def test_classify(self):
+        """Классификация по числу успешных перезапусков и outage"""
+        assert classify(0, outage=False) == "deterministic"
+        assert classify(1, outage=False) == "flaky"
+        assert classify(3, outage=False) == "flaky"
+        assert classify(0, outage=True) == "outage"
+        assert classify(3, outage=True) == "outage"
+
+    def test_score_and_quarantine(self, tmp_path):
+        """Score растёт при flaky, падает при стабильных прогонах, порог задаёт quarantine"""
+        db = FlakinessDB(str(tmp_path / "flaky.json"))
+        db.update("t::a", True, "flaky")
+        db.update("t::a", True, "flaky")
+        db.update("t::b", True, "flaky")
+        db.update("t::b", False)
+        db.save(threshold=0.4)
+
+        reloaded = FlakinessDB(str(tmp_path / "flaky.json"))
+        assert reloaded.data["tests"]["t::a"]["score"] == 0.51
+        assert reloaded.data["tests"]["t::b"]["score"] == 0.21
+        assert reloaded.quarantine == {"t::a"}
+
+    def test_service_probe(self, stub_service):
+        """Доступная заглушка - не outage, закрытый порт - outage"""
+        assert not service_is_down(stub_service.url)
+        assert service_is_down("http://127.0.0.1:1", timeout=1)
+
+    def test_reruns_classify_failures(self, sample_project, stub_service):
+        """Упавшие тесты перезапускаются параллельно и получают классификацию и score"""
+        result = run_flaky(sample_project, "--flaky-reruns", "3", "--flaky-probe-url", stub_service.url)
+
+        result.stdout.fnmatch_lines([
+            "*- flakiness -*",
+            "flaky         3/3 reruns passed  test_sample.py::test_flaky  (score 0.30)",
+            "deterministic 0/3 reruns passed  test_sample.py::test_broken  (score 0.00)",
+        ])
+        db = read_db(sample_project)
+        assert db["tests"]["test_sample.py::test_flaky"]["last"] == "flaky"
+        assert db["tests"]["test_sample.py::test_flaky"]["score"] == 0.3
+        assert db["tests"]["test_sample.py::test_broken"]["score"] == 0.0
+        assert db["tests"]["test_sample.py::test_stable"]["runs"] == 1
+        assert db["quarantine"] == ["test_sample.py::test_flaky"]
+
+    def test_outage_is_not_scored(self, pytester):
+        """При недоступном сервисе падения классифицируются как outage без изменения score"""
+        pytester.makepyfile(test_sample="def test_down():\n    assert False\n")
+
+        result = run_flaky(pytester, "--flaky-reruns", "2", "--flaky-probe-url", "http://127.0.0.1:1")
+
+        result.stdout.fnmatch_lines(["outage        0/2 reruns passed  test_sample.py::test_down"])
+        assert "test_sample.py::test_down" not in read_db(pytester)["tests"]
+
+    def test_outage_during_main_run(self, sample_project):
+        """Сервис лежал во время основного прогона и поднялся к перезапускам - это outage, а не flaky"""
+        with RecoveringService(failing=len(PROBES)) as service:
+            result = run_flaky(sample_project, "--flaky-reruns", "2", "-k", "flaky",
+                               "--flaky-probe-url", service.url)
+
+        result.stdout.fnmatch_lines(["outage        2/2 reruns passed  test_sample.py::test_flaky"])
+        assert read_db(sample_project)["tests"] == {}
+
+    def test_rerun_keeps_main_run_options(self, pytester):
+        """Перезапуск получает опции основного прогона, но не пути и не опции отчётов"""
+        pytester.makeconftest('''
+            def pytest_addoption(parser):
+                parser.addoption("--mode", default="default")
+        ''')
+        pytester.makepyfile(test_sample='''
+            from pathlib import Path
+
+            LOG = Path(__file__).with_name("runs.log")
+
+
+            def test_mode(request):
+                with LOG.open("a") as log:
+                    log.write(request.config.getoption("--mode") + "\\n")
+                assert request.config.getoption("--mode") == "default"
+
+
+            def test_other():
+                with LOG.open("a") as log:
+                    log.write("other\\n")
+        ''')
+
+        result = run_flaky(pytester, "test_sample.py", "--mode", "strict", "--flaky-reruns", "2",
+                           "-p", "utils.streaming_report", "--stream-junit", str(pytester.path / "junit.xml"))
+
+        result.stdout.fnmatch_lines(["deterministic 0/2 reruns passed  test_sample.py::test_mode*"])
+        runs = (pytester.path / "runs.log").read_text().split()
+        assert sorted(runs) == ["other", "strict", "strict", "strict"]
+        assert 'tests="2"' in (pytester.path / "junit.xml").read_text(encoding="utf-8")
+
+    def test_quarantine_marks_xfail(self, sample_project):
+        """С --flaky-quarantine тесты из quarantine становятся xfail"""
+        db = FlakinessDB(str(sample_project.path / "flaky.json"))
+        db.update("test_sample.py::test_broken", True, "flaky")
+        db.save(threshold=0.1)
+
+        result = run_flaky(sample_project, "--flaky-quarantine", "-k", "broken", "-rx")
+
+        result.assert_outcomes(xfailed=1, deselected=2)
+        result.stdout.fnmatch_lines(["*quarantined as flaky*"])
@@ -0,0 +1,103 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import requests
+
+from utils.smoke_monitor import MetricsServer, ProbeStats, SmokeMetrics
+from utils.stats import quantile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestSmokeMonitor:
+    """
+    Тесты синтетического мониторинга (utils/smoke_monitor.py)
+    """
+
+    def test_quantile_nearest_rank(self):
+        """Квантиль считается методом ближайшего ранга"""
+        values = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+
+        assert quantile(values, 0.5) == 0.5
+        assert quantile(values, 0.9) == 0.9
+        assert quantile(values, 0.99) == 1.0
+        assert quantile([], 0.5) is None
+
+    def test_rolling_window(self):
+        """Старые результаты выпадают из окна и не влияют на доступность"""
+        stats = ProbeStats(windows=(60, 600))
+        stats.add(1000, 0.1, "failed")
+        stats.add(1500, 0.2, "passed")
+        stats.add(1550, 0.3, "passed")
+
+        assert stats.window(60, now=1560) == (1.0, [0.2, 0.3])
+        availability, durations = stats.window(600, now=1560)
+        assert round(availability, 3) == 0.667
+        assert durations == [0.1, 0.2, 0.3]
+
+        stats.add(1700, 0.4, "passed")
+        assert len(stats.samples) == 3
+
+    def test_prometheus_format(self):
+        """Метрики выводятся в текстовом формате Prometheus"""
+        metrics = SmokeMetrics(windows=(300,))
+        metrics.record("tests/test_x.py::test_a", 0.25, "passed", timestamp=100)
+        metrics.record("tests/test_x.py::test_a", 0.75, "failed", timestamp=110)
+        metrics.finish_cycle()
+
+        text = metrics.render(now=120)
+
+        assert "smoke_monitor_cycles_total 1" in text
+        assert 'smoke_probe_up{probe="tests/test_x.py::test_a"} 0' in text
+        assert 'smoke_probe_availability_ratio{probe="tests/test_x.py::test_a",window="300s"} 0.500000' in text
+        assert 'smoke_probe_runs_total{probe="tests/test_x.py::test_a",outcome="failed"} 1' in text
+        assert "# TYPE smoke_probe_latency_seconds summary" in text
+
+    def test_metrics_endpoint(self):
+        """/metrics отдаёт текущие метрики"""
+        metrics = SmokeMetrics()
+        metrics.finish_cycle()
+
+        with MetricsServer(metrics) as server:
+            response = requests.get(f"{server.url}/metrics")
+            missing = requests.get(f"{server.url}/other")
+
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert "smoke_monitor_cycles_total 1" in response.text
+        assert missing.status_code == 404
+
+    def test_monitor_runs_smoke_set_in_cycles(self, stub_service, tmp_path):
+        """Монитор прогоняет smoke-тесты заданное число циклов и пишет метрики в файл"""
+        metrics_file = tmp_path / "smoke.prom"
+
+        result = subprocess.run(
+            [sys.executable, "-m", "utils.smoke_monitor", "--base-url", stub_service.url,
+             "--cycles", "2", "--interval", "0", "--metrics-file", str(metrics_file)],
+            cwd=ROOT, capture_output=True, text=True, timeout=120
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        text = metrics_file.read_text(encoding="utf-8")
+        assert "smoke_monitor_cycles_total 2" in text
+        assert 'test_get_existing_item",outcome="passed"} 2' in text
+        assert 'test_get_statistic_success",outcome="passed"} 2' in text
+        assert "outcome=\"failed\"} 0" in text
+
+    def test_monitor_single_probe(self, stub_service, tmp_path):
+        """Одна проба проходит в каждом цикле, её фикстуры пересоздаются"""
+        metrics_file = tmp_path / "smoke.prom"
+
+        result = subprocess.run(
+            [sys.executable, "-m", "utils.smoke_monitor", "--base-url", stub_service.url,
+             "--cycles", "3", "--interval", "0", "--metrics-file", str(metrics_file),
+             "--", "-k", "test_get_existing_item"],
+            cwd=ROOT, capture_output=True, text=True, timeout=120
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        text = metrics_file.read_text(encoding="utf-8")
+        assert "smoke_monitor_cycles_total 3" in text
+        assert 'test_get_existing_item",outcome="passed"} 3' in text
+        assert 'test_get_existing_item",outcome="failed"} 0' in text
@@ -0,0 +1,112 @@
+import io
+import json
+
+from utils.api_client import APIClient
+from utils.fault_proxy import FaultProxy
+from utils.soak import OPERATIONS, DriftDetector, SoakRunner, format_window, rss_bytes
+from utils.stub_service import StubItemService
+
+
+def window(p95, rss_mb=100.0, traced_mb=None):
+    summary = {
+        "operations": {operation: {"p95": p95} for operation in OPERATIONS},
+        "rss_bytes": rss_mb * 1024 * 1024,
+    }
+    if traced_mb is not None:
+        summary["traced_bytes"] = traced_mb * 1024 * 1024
+    return summary
+
+
+class TestSoak:
+    """
+    Тесты длительного прогона (utils/soak.py)
+    """
+
+    def test_rss_is_measured(self):
+        """RSS процесса доступен и больше нуля"""
+        assert rss_bytes() > 0
+
+    def test_drift_detector_baseline(self):
+        """Пока набирается база, дрейф не отмечается; база - среднее первых окон"""
+        detector = DriftDetector(latency_threshold=0.5, baseline_windows=2)
+
+        assert detector.check(window(0.1)) == []
+        assert detector.check(window(0.3)) == []
+        assert detector.baseline["p95"]["get_item"] == 0.2
+
+        assert detector.check(window(0.29)) == []
+        flags = detector.check(window(0.31))
+        assert len(flags) == len(OPERATIONS)
+        assert flags[0].startswith("create_item p95 310.0ms > baseline 200.0ms")
+
+    def test_drift_detector_memory(self):
+        """Рост RSS и tracemalloc сверх порога отмечается"""
+        detector = DriftDetector(rss_threshold_mb=10, traced_threshold_mb=5)
+        detector.check(window(0.1, rss_mb=100, traced_mb=1))
+
+        assert detector.check(window(0.1, rss_mb=105, traced_mb=3)) == []
+        flags = detector.check(window(0.1, rss_mb=120, traced_mb=10))
+        assert flags == [
+            "rss grew by 20.0MB (threshold 10.0MB)",
+            "tracemalloc grew by 9.0MB (threshold 5.0MB)",
+        ]
+
+    def test_soak_run_writes_windows(self, stub_service):
+        """Короткий прогон даёт несколько окон со статистикой по всем операциям"""
+        report = io.StringIO()
+        runner = SoakRunner(APIClient(stub_service.url), duration=0.6, window=0.2,
+                            report=report, top_allocators=3)
+
+        windows = runner.run()
+
+        assert len(windows) >= 2
+        first = windows[0]
+        assert first["iterations"] > 0
+        for operation in OPERATIONS:
+            assert first["operations"][operation]["count"] == first["iterations"]
+            assert first["operations"][operation]["errors"] == 0
+        assert "traced_bytes" in first
+        assert len(first["top_allocators"]) <= 3
+        lines = report.getvalue().splitlines()
+        assert [json.loads(line)["window"] for line in lines] == list(range(len(windows)))
+        assert "get_statistic: p50" in format_window(first)
+
+    def test_status_only_create_response(self):
+        """id берётся из текста status, как у реального сервиса, и каждое объявление удаляется"""
+        with StubItemService(status_response=True) as service:
+            runner = SoakRunner(APIClient(service.url), duration=0.3, window=1.0,
+                                trace_memory=False)
+            windows = runner.run()
+
+        summary = windows[-1]
+        assert summary["iterations"] > 0
+        for operation in OPERATIONS:
+            assert summary["operations"][operation]["errors"] == 0
+            assert summary["operations"][operation]["count"] == summary["iterations"]
+
+    def test_latency_drift_is_flagged(self, stub_service):
+        """Замедление сервиса после первого окна отмечается как дрейф"""
+        with FaultProxy(stub_service.url) as proxy:
+            runner = SoakRunner(APIClient(proxy.url), duration=0.8, window=0.2,
+                                detector=DriftDetector(latency_threshold=1.0),
+                                trace_memory=False)
+
+            def slow_down(summary):
+                if summary["window"] == 0:
+                    proxy.add_rule(endpoint="get_item", latency=0.05)
+
+            windows = runner.run(on_window=slow_down)
+
+        assert runner.drifted
+        assert any("get_item p95" in flag for flag in windows[-1]["drift"])
+        assert "traced_bytes" not in windows[0]
+
+    def test_unavailable_service_counts_errors(self):
+        """Недоступный сервис даёт ошибки create_item без busy loop"""
+        runner = SoakRunner(APIClient("http://127.0.0.1:1"), duration=0.3, window=1.0,
+                            trace_memory=False, error_pause=0.1)
+
+        windows = runner.run()
+
+        assert windows[-1]["iterations"] == 0
+        assert 1 <= windows[-1]["operations"]["create_item"]["errors"] <= 5
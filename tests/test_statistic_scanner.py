@@ -0,0 +1,151 @@
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.api_client import APIClient
+from utils.fault_proxy import FaultProxy
+from utils.statistic_scanner import Checkpoint, StatisticScanner, bounded_map, main
+from utils.stub_service import StubItemService
+from utils.warmup import create_session
+
+
+class DriftingStubService(StubItemService):
+    """Заглушка, у которой v2 отдаёт другую статистику для выбранных id"""
+
+    def __init__(self):
+        super().__init__()
+        self.drifted = set()
+
+    def get_statistic(self, item_id, version):
+        statistics = super().get_statistic(item_id, version)
+        if statistics and version == 2 and item_id in self.drifted:
+            return dict(statistics, likes=statistics["likes"] + 1)
+        return statistics
+
+
+@pytest.fixture
+def drifting_stub():
+    with DriftingStubService() as service:
+        yield service
+
+
+def create_items(url, seller_id, count):
+    client = APIClient(url)
+    return [
+        client.create_item({
+            "sellerID": seller_id,
+            "name": f"Объявление {i}",
+            "price": i,
+            "statistics": {"likes": i, "viewCount": 1, "contacts": 1}
+        }).json()["id"]
+        for i in range(count)
+    ]
+
+
+class TestStatisticScanner:
+    """
+    Тесты сверки статистики v1/v2 (utils/statistic_scanner.py)
+    """
+
+    def test_bounded_map_limits_in_flight(self):
+        """В работе одновременно не больше limit задач"""
+        active, peak = [0], [0]
+
+        def task(value):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            active[0] -= 1
+            return value * 2
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = sorted(bounded_map(executor, task, range(20), limit=3))
+
+        assert results == [value * 2 for value in range(20)]
+        assert peak[0] <= 3
+
+    def test_reports_mismatches(self, drifting_stub, new_seller_id):
+        """Расхождения v1/v2 и несуществующие id попадают в итог, расхождения - в отчёт"""
+        ids = create_items(drifting_stub.url, new_seller_id, 10)
+        drifting_stub.drifted.update(ids[:2])
+        report = io.StringIO()
+
+        scanner = StatisticScanner(APIClient(drifting_stub.url), concurrency=4, report=report)
+        summary = scanner.scan(ids + ["00000000-0000-0000-0000-000000000000"])
+
+        assert (summary.scanned, summary.matched, summary.mismatched, summary.missing) == (11, 8, 2, 1)
+        records = [json.loads(line) for line in report.getvalue().splitlines()]
+        assert sorted(record["id"] for record in records) == sorted(ids[:2])
+        assert records[0]["v1"] != records[0]["v2"]
+
+    def test_resume_from_checkpoint(self, stub_service, new_seller_id, tmp_path):
+        """Повторный запуск с тем же checkpoint пропускает уже проверенные id"""
+        ids = create_items(stub_service.url, new_seller_id, 6)
+        path = str(tmp_path / "scan.checkpoint")
+
+        checkpoint = Checkpoint(path)
+        StatisticScanner(APIClient(stub_service.url), checkpoint=checkpoint).scan(ids[:4])
+        checkpoint.close()
+
+        checkpoint = Checkpoint(path)
+        summary = StatisticScanner(APIClient(stub_service.url), checkpoint=checkpoint).scan(ids)
+        checkpoint.close()
+
+        assert (summary.scanned, summary.skipped) == (2, 4)
+
+    def test_errors_are_not_checkpointed(self, stub_service, new_seller_id):
+        """Id с ошибкой запроса остаются непроверенными для повторного запуска"""
+        ids = create_items(stub_service.url, new_seller_id, 2)
+        with FaultProxy(stub_service.url) as proxy:
+            proxy.add_rule(path=f"^/api/2/statistic/{ids[0]}$", reset_rate=1.0)
+            scanner = StatisticScanner(APIClient(proxy.url))
+            summary = scanner.scan(ids)
+
+        assert (summary.errors, summary.matched) == (1, 1)
+        assert scanner.checkpoint.items == {ids[1]}
+
+    def test_seller_range_walk(self, stub_service, tmp_path):
+        """Обход диапазона продавцов находит их объявления и отмечает продавцов"""
+        first = 700000
+        ids = create_items(stub_service.url, first, 3) + create_items(stub_service.url, first + 2, 2)
+        checkpoint = Checkpoint(str(tmp_path / "scan.checkpoint"))
+
+        scanner = StatisticScanner(APIClient(stub_service.url), concurrency=2, checkpoint=checkpoint)
+        summary = scanner.scan(scanner.seller_item_ids(range(first, first + 4)))
+        checkpoint.close()
+
+        assert summary.matched == len(ids)
+        assert checkpoint.items == set(ids)
+        assert checkpoint.sellers == {str(seller) for seller in range(first, first + 4)}
+
+    def test_throughput_scales_with_concurrency(self, stub_service, new_seller_id):
+        """При задержке сервиса параллельная сверка заметно быстрее последовательной"""
+        ids = create_items(stub_service.url, new_seller_id, 16)
+        with FaultProxy(stub_service.url) as proxy:
+            proxy.add_rule(endpoint="get_statistic", latency=0.03)
+            durations = {}
+            for concurrency in (1, 8):
+                client = APIClient(proxy.url, session=create_session(pool_size=concurrency * 3))
+                summary = StatisticScanner(client, concurrency=concurrency).scan(ids)
+                assert summary.matched == len(ids)
+                durations[concurrency] = summary.elapsed
+
+        assert durations[8] < durations[1] / 3
+
+    def test_cli(self, drifting_stub, new_seller_id, tmp_path, capsys):
+        """CLI возвращает 1 при найденных расхождениях и пишет отчёт"""
+        ids = create_items(drifting_stub.url, new_seller_id, 3)
+        drifting_stub.drifted.add(ids[0])
+        ids_file = tmp_path / "ids.txt"
+        ids_file.write_text("\n".join(ids), encoding="utf-8")
+        report = tmp_path / "report.jsonl"
+
+        code = main(["--ids-file", str(ids_file), "--base-url", drifting_stub.url,
+                     "--report", str(report), "--concurrency", "2"])
+
+        assert code == 1
+        assert json.loads(report.read_text(encoding="utf-8"))["id"] == ids[0]
+        assert "mismatched 1" in capsys.readouterr().out
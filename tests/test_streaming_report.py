@@ -0,0 +1,169 @@
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from utils import streaming_report
+from utils.streaming_report import CaseResult, HTMLStreamWriter, JUnitStreamWriter
+
+SAMPLE_TESTS = '''
+import os
+import signal
+
+import pytest
+
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("fixture is broken")
+
+
+@pytest.mark.parametrize("value", range(25))
+def test_many(value):
+    assert value != 7, "seven is not allowed"
+
+
+def test_skipped():
+    pytest.skip("not today")
+
+
+@pytest.mark.xfail(reason="known bug")
+def test_xfail():
+    print("output \\x00 with control char")
+    assert False
+
+
+def test_error(broken):
+    pass
+
+
+def test_killed():
+    if os.environ.get("KILL_RUN"):
+        os.kill(os.getpid(), signal.SIGKILL)
+'''
+
+
+@pytest.fixture
+def sample_project(pytester):
+    pytester.makepyfile(test_sample=SAMPLE_TESTS)
+    return pytester
+
+
+def report_args(pytester):
+    return ("-p", "utils.streaming_report", "-p", "no:cacheprovider",
+            "--stream-junit", str(pytester.path / "out" / "junit.xml"),
+            "--stream-html", str(pytester.path / "out" / "html"), "--stream-html-page-size", "10")
+
+
+class FakeReport:
+    def __init__(self, when, outcome="passed", longreprtext="", duration=0.01):
+        self.when = when
+        self.outcome = outcome
+        self.passed = outcome == "passed"
+        self.failed = outcome == "failed"
+        self.skipped = outcome == "skipped"
+        self.longrepr = None
+        self.longreprtext = longreprtext
+        self.duration = duration
+        self.capstdout = ""
+        self.capstderr = ""
+
+
+def case(nodeid, outcome="passed", when="call"):
+    reports = [FakeReport("setup"), FakeReport("call"), FakeReport("teardown")]
+    index = ("setup", "call", "teardown").index(when)
+    reports[index] = FakeReport(when, outcome, "Traceback\nAssertionError: boom")
+    return CaseResult(nodeid, reports)
+
+
+class TestStreamingReport:
+    """
+    Тесты потоковых отчётов (utils/streaming_report.py)
+    """
+
+    def test_junit_valid_after_every_case(self, tmp_path):
+        """После каждой записи файл разбирается как XML и счётчики актуальны"""
+        path = tmp_path / "junit.xml"
+        writer = JUnitStreamWriter(str(path))
+        assert ET.parse(path).getroot().find("testsuite").get("tests") == "0"
+
+        writer.add(case("tests/test_a.py::TestA::test_ok"))
+        writer.add(case("tests/test_a.py::TestA::test_fail", "failed"))
+        writer.add(case("tests/test_a.py::test_setup", "failed", when="setup"))
+        suite = ET.parse(path).getroot().find("testsuite")
+        assert (suite.get("tests"), suite.get("failures"), suite.get("errors")) == ("3", "1", "1")
+        cases = suite.findall("testcase")
+        assert cases[0].get("classname") == "tests.test_a.TestA"
+        assert cases[0].get("name") == "test_ok"
+        assert cases[1].find("failure").get("message") == "AssertionError: boom"
+        assert cases[2].find("error").get("message") == "setup failed: AssertionError: boom"
+        writer.close()
+        assert ET.parse(path).getroot().find("testsuite").get("tests") == "3"
+
+    def test_html_pages(self, tmp_path):
+        """Страницы по page_size строк со ссылками и сводка в index.html"""
+        writer = HTMLStreamWriter(str(tmp_path), page_size=2)
+        for index in range(5):
+            writer.add(case(f"test_a.py::test_{index}", "failed" if index == 3 else "passed"))
+        writer.close()
+
+        assert sorted(os.listdir(tmp_path)) == [
+            "index.html", "page-0001.html", "page-0002.html", "page-0003.html"
+        ]
+        second = (tmp_path / "page-0002.html").read_text(encoding="utf-8")
+        assert second.count("<tr><td>") == 2
+        assert 'href="page-0001.html">previous' in second
+        assert 'href="page-0003.html">next' in second
+        assert "AssertionError: boom" in second
+        index = (tmp_path / "index.html").read_text(encoding="utf-8")
+        assert "status: finished" in index
+        assert "5 tests: passed 4, failed 1" in index
+
+    def test_html_index_follows_rows(self, tmp_path, monkeypatch):
+        """Сводка в index.html обновляется по ходу прогона, а не только при смене страницы"""
+        monkeypatch.setattr(streaming_report, "INDEX_INTERVAL", 0)
+        writer = HTMLStreamWriter(str(tmp_path), page_size=10)
+        for index in range(3):
+            writer.add(case(f"test_a.py::test_{index}"))
+
+        assert "3 tests: passed 3" in (tmp_path / "index.html").read_text(encoding="utf-8")
+        writer.close()
+
+    def test_pytest_run(self, sample_project):
+        """Полный прогон pytest: корректный JUnit XML и HTML по страницам"""
+        result = sample_project.runpytest(*report_args(sample_project))
+
+        result.assert_outcomes(passed=25, failed=1, errors=1, skipped=1, xfailed=1)
+        suite = ET.parse(sample_project.path / "out" / "junit.xml").getroot().find("testsuite")
+        assert suite.get("tests") == "29"
+        assert (suite.get("failures"), suite.get("errors"), suite.get("skipped")) == ("1", "1", "2")
+        xfail = [element for element in suite.findall("testcase") if element.get("name") == "test_xfail"][0]
+        assert xfail.find("skipped").get("message") == "xfail: known bug"
+        assert "output ? with control char" in xfail.find("system-out").text
+
+        html_dir = sample_project.path / "out" / "html"
+        assert sorted(os.listdir(html_dir)) == [
+            "index.html", "page-0001.html", "page-0002.html", "page-0003.html"
+        ]
+        assert "29 tests: passed 25, failed 1, error 1, skipped 1, xfailed 1" in \
+            (html_dir / "index.html").read_text(encoding="utf-8")
+
+    def test_killed_run_stays_readable(self, sample_project, monkeypatch, request):
+        """После SIGKILL посреди прогона записанные тесты доступны в обоих отчётах"""
+        monkeypatch.setenv("KILL_RUN", "1")
+        # Подпроцессу pytester нужен корень репозитория для импорта utils
+        monkeypatch.setenv("PYTHONPATH", str(request.config.rootpath))
+        result = sample_project.runpytest_subprocess(*report_args(sample_project))
+
+        assert result.ret != 0
+        suite = ET.parse(sample_project.path / "out" / "junit.xml").getroot().find("testsuite")
+        names = [element.get("name") for element in suite.findall("testcase")]
+        assert len(names) == 28 and "test_killed" not in names
+        assert suite.get("tests") == "28"
+
+        html_dir = sample_project.path / "out" / "html"
+        last_page = (html_dir / "page-0003.html").read_text(encoding="utf-8")
+        assert last_page.count("<tr><td>") == 8
+        index = (html_dir / "index.html").read_text(encoding="utf-8")
+        assert "status: running" in index
+        assert 'href="page-0003.html"' in index
@@ -0,0 +1,156 @@
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+import uuid
+
+import pytest
+import requests
+
+from utils.api_client import APIClient
+from utils.stub_service import StubItemService
+from utils.warmup import ConnectionWarmer, DNSCache, create_session
+
+
+class TLSStubItemService(StubItemService):
+    """Заглушка сервиса, отдающая HTTPS с самоподписанным сертификатом"""
+
+    def __init__(self, certfile, keyfile):
+        super().__init__()
+        self.certfile = certfile
+        self.keyfile = keyfile
+
+    def make_server(self):
+        server = super().make_server()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.certfile, self.keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        return server
+
+    @property
+    def url(self):
+        return f"https://localhost:{self._server.server_address[1]}"
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not available")
+    directory = tmp_path_factory.mktemp("tls")
+    certfile, keyfile = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+         "-keyout", str(keyfile), "-out", str(certfile)],
+        check=True, capture_output=True
+    )
+    return str(certfile), str(keyfile)
+
+
+@pytest.fixture
+def tls_stub(certificate):
+    with TLSStubItemService(*certificate) as service:
+        yield service
+
+
+class TestWarmup:
+    """
+    Тесты прогрева соединений (utils/warmup.py)
+    """
+
+    def test_dns_cache_hits(self):
+        """Повторный резолв того же хоста берётся из кэша"""
+        cache = DNSCache()
+
+        first = cache.getaddrinfo("localhost", 80)
+        second = cache.getaddrinfo("localhost", 80)
+
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_dns_cache_expires(self):
+        """Записи с истёкшим TTL резолвятся заново"""
+        cache = DNSCache(ttl=0)
+
+        cache.getaddrinfo("localhost", 80)
+        cache.getaddrinfo("localhost", 80)
+
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_warmup_opens_pooled_connections(self, stub_service, valid_item_data):
+        """Прогрев открывает заданное число соединений, и клиент их использует"""
+        session = create_session()
+        report = ConnectionWarmer(session, stub_service.url, connections=3).run()
+
+        assert report.error is None
+        assert report.opened_connections == 3
+        assert report.dns_seconds is not None
+        assert report.total_seconds > 0
+
+        client = APIClient(stub_service.url, session=session)
+        assert client.create_item(valid_item_data).status_code == 200
+        session.close()
+
+    def test_warmup_resumes_tls_sessions(self, tls_stub, certificate, valid_item_data):
+        """Дополнительные соединения пула возобновляют TLS-сессию первого"""
+        session = create_session()
+        session.trust_env = False
+        session.verify = certificate[0]
+        report = ConnectionWarmer(session, tls_stub.url, connections=4).run()
+
+        assert report.error is None
+        assert report.opened_connections == 4
+        assert report.tls_resumed >= 3
+
+        client = APIClient(tls_stub.url, session=session)
+        assert client.create_item(valid_item_data).status_code == 200
+        session.close()
+
+    @pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+    def test_verify_modes_do_not_leak(self, tls_stub, certificate):
+        """verify=False работает и не отключает проверку для остальных запросов сессии"""
+        session = create_session()
+        session.trust_env = False
+        url = f"{tls_stub.url}/api/1/item/{uuid.uuid4()}"
+
+        assert session.get(url, verify=False).status_code == 404
+        with pytest.raises(requests.exceptions.SSLError):
+            session.get(url)
+        assert session.get(url, verify=certificate[0]).status_code == 404
+        assert session.get(url, verify=False).status_code == 404
+        session.close()
+
+    def test_warmup_timeout_on_silent_server(self):
+        """Сервер принимает соединение, но молчит: прогрев завершается по таймауту с ошибкой"""
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(16)
+        try:
+            url = f"http://127.0.0.1:{listener.getsockname()[1]}"
+            warmer = ConnectionWarmer(create_session(), url, connections=2, timeout=0.2)
+            report = warmer.run()
+        finally:
+            listener.close()
+
+        assert "Timeout" in report.error
+        assert report.total_seconds < 2
+
+    def test_wait_is_bounded(self):
+        """Ожидание зависшего прогрева ограничено, а зависание видно в отчёте"""
+        warmer = ConnectionWarmer(create_session(), "http://127.0.0.1:1", timeout=0.05)
+        release = threading.Event()
+        thread = threading.Thread(target=release.wait, daemon=True)
+        thread.start()
+
+        warmer.wait(thread)
+        release.set()
+
+        assert "timed out" in warmer.report.lines()[0]
+
+    def test_warmup_reports_error(self):
+        """Недоступный сервис не роняет прогрев, а попадает в отчёт"""
+        report = ConnectionWarmer(create_session(), "http://127.0.0.1:1", connections=2).run()
+
+        assert report.error is not None
+        assert "failed" in report.lines()[0]
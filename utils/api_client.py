@@ -0,0 +1,130 @@
+import re
+
+import requests
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+
+from utils.compression import DECODE_ERRORS, StreamDecoder, accept_encoding
+
+BASE_URL = "https://qa-internship.avito.com"
+READ_CHUNK_SIZE = 16 * 1024
+UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+# Реальный сервис вместо тела объявления отдаёт {"status": "Сохранили объявление - <uuid>"}
+_STATUS_ID = re.compile(f"({UUID_RE.pattern})\\s*$")
+
+
+def created_id(body):
+    """id созданного объявления из поля id или из текста status (None, если его нет)"""
+    if not isinstance(body, dict):
+        return None
+    if body.get("id"):
+        return body["id"]
+    status = body.get("status")
+    match = _STATUS_ID.search(status) if isinstance(status, str) else None
+    return match.group(1) if match else None
+
+
+class APIClient:
+    """
+    API клиент с базовыми методами.
+
+    compression - запрашивать сжатые ответы (gzip/deflate, br при наличии brotli)
+    transfer_stats - TransferStats для учёта байтов на проводе и после декодирования
+    """
+
+    def __init__(self, base_url, timeout=None, session=None, compression=False,
+                 transfer_stats=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        # Общая сессия держит пул keep-alive соединений между запросами
+        self.session = session or requests.Session()
+        self.compression = compression
+        self.transfer_stats = transfer_stats
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        if accept_encoding(compression) is not None:
+            self.headers["Accept-Encoding"] = accept_encoding(compression)
+
+    def _request(self, endpoint, method, url, **kwargs):
+        headers = {"Accept": "application/json"}
+        if "Accept-Encoding" in self.headers:
+            headers["Accept-Encoding"] = self.headers["Accept-Encoding"]
+        headers.update(kwargs.pop("headers", {}))
+        if not self.compression and self.transfer_stats is None:
+            return self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+
+        response = self.session.request(
+            method, url, headers=headers, timeout=self.timeout, stream=True, **kwargs
+        )
+        self._read_body(endpoint, response)
+        return response
+
+    def _read_body(self, endpoint, response):
+        """Потоковое чтение и декодирование тела с подсчётом байтов"""
+        content_encoding = response.headers.get("Content-Encoding")
+        wire_bytes = 0
+        chunks = []
+        try:
+            decoder = StreamDecoder(content_encoding)
+            for chunk in response.raw.stream(READ_CHUNK_SIZE, decode_content=False):
+                wire_bytes += len(chunk)
+                chunks.append(decoder.decompress(chunk))
+            chunks.append(decoder.flush())
+            # Тело прочитано до конца, и urllib3 уже вернул соединение в пул.
+            # _content_consumed и _content (ниже) - приватные поля requests:
+            # close() не трогает raw, а .content/.json() отдают декодированное
+            # тело. Это поведение закреплено test_streaming_path_reuses_connection
+            # в tests/test_compression.py
+            response._content_consumed = True
+        except DECODE_ERRORS + (DecodeError,) as exc:
+            raise requests.exceptions.ContentDecodingError(exc, response=response)
+        except ProtocolError as exc:
+            raise requests.exceptions.ChunkedEncodingError(exc, response=response)
+        except ReadTimeoutError as exc:
+            raise requests.exceptions.ConnectionError(exc, response=response)
+        finally:
+            response.close()
+
+        response._content = b"".join(chunks)
+        if self.transfer_stats is not None:
+            self.transfer_stats.record(
+                endpoint, wire_bytes, len(response._content), content_encoding, self.compression
+            )
+
+    def create_item(self, data):
+        """POST /api/1/item - Создать объявление"""
+        return self._request(
+            "create_item", "POST",
+            f"{self.base_url}/api/1/item",
+            json=data,
+            headers=self.headers
+        )
+
+    def get_item(self, item_id):
+        """GET /api/1/item/{id} - Получить объявление по ID"""
+        return self._request(
+            "get_item", "GET",
+            f"{self.base_url}/api/1/item/{item_id}"
+        )
+
+    def get_seller_items(self, seller_id):
+        """GET /api/1/{sellerID}/item - Получить все объявления продавца"""
+        return self._request(
+            "get_seller_items", "GET",
+            f"{self.base_url}/api/1/{seller_id}/item"
+        )
+
+    def get_statistic(self, item_id, version=1):
+        """GET /api/{version}/statistic/{id} - Получить статистику"""
+        return self._request(
+            "get_statistic", "GET",
+            f"{self.base_url}/api/{version}/statistic/{item_id}"
+        )
+
+    def delete_item(self, item_id):
+        """DELETE /api/2/item/{id} - Удалить объявление"""
+        return self._request(
+            "delete_item", "DELETE",
+            f"{self.base_url}/api/2/item/{item_id}"
+        )
@@ -0,0 +1,156 @@
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+# Исключения, которые бросают декодеры на повреждённых данных
+DECODE_ERRORS = (ValueError, zlib.error) + ((brotli.error,) if brotli is not None else ())
+
+SUPPORTED_ENCODINGS = ("gzip", "deflate", "br") if brotli is not None else ("gzip", "deflate")
+
+# Ответ такого размера без Content-Encoding считаем признаком того,
+# что сервер проигнорировал Accept-Encoding
+IGNORED_COMPRESSION_THRESHOLD = 1024
+
+
+def accept_encoding(compression):
+    """
+    Значение заголовка Accept-Encoding для клиента. None - оставить заголовок
+    requests по умолчанию ("gzip, deflate")
+    """
+    return ", ".join(SUPPORTED_ENCODINGS) if compression else None
+
+
+class _DeflateDecoder:
+    """deflate бывает как с zlib-обёрткой, так и «сырым» - определяем по первым байтам"""
+
+    def __init__(self):
+        self._first_try = True
+        self._data = b""
+        self._obj = zlib.decompressobj()
+
+    def decompress(self, data):
+        if not self._first_try:
+            return self._obj.decompress(data)
+        self._data += data
+        try:
+            decoded = self._obj.decompress(data)
+            if decoded:
+                self._first_try = False
+                self._data = b""
+            return decoded
+        except zlib.error:
+            self._first_try = False
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            try:
+                return self.decompress(self._data)
+            finally:
+                self._data = b""
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data):
+        if hasattr(self._obj, "process"):
+            return self._obj.process(data)
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return b""
+
+
+class _GzipDecoder:
+    def __init__(self):
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+def _decoder_for(encoding):
+    if encoding in ("gzip", "x-gzip"):
+        return _GzipDecoder()
+    if encoding == "deflate":
+        return _DeflateDecoder()
+    if encoding == "br" and brotli is not None:
+        return _BrotliDecoder()
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+
+class StreamDecoder:
+    """
+    Потоковый декодер тела ответа по заголовку Content-Encoding.
+    Несколько кодировок ("gzip, br") снимаются в обратном порядке.
+    """
+
+    def __init__(self, content_encoding):
+        encodings = [
+            value.strip().lower() for value in (content_encoding or "").split(",")
+            if value.strip() and value.strip().lower() != "identity"
+        ]
+        self.decoders = [_decoder_for(encoding) for encoding in reversed(encodings)]
+
+    def decompress(self, data):
+        for decoder in self.decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self):
+        data = b""
+        for decoder in self.decoders:
+            data = (decoder.decompress(data) if data else b"") + decoder.flush()
+        return data
+
+
+class TransferStats:
+    """
+    Учёт передаваемых данных по эндпоинтам:
+    байты «на проводе» (как пришли) и после декодирования.
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, wire_bytes, decoded_bytes, content_encoding, compression_requested):
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                "requests": 0, "wire_bytes": 0, "decoded_bytes": 0,
+                "compressed": 0, "ignored": 0,
+            })
+            stats["requests"] += 1
+            stats["wire_bytes"] += wire_bytes
+            stats["decoded_bytes"] += decoded_bytes
+            if content_encoding and content_encoding.lower() != "identity":
+                stats["compressed"] += 1
+            elif compression_requested and decoded_bytes >= IGNORED_COMPRESSION_THRESHOLD:
+                stats["ignored"] += 1
+
+    def lines(self):
+        lines = []
+        with self._lock:
+            items = sorted(self.endpoints.items())
+        for endpoint, stats in items:
+            saved = 0.0
+            if stats["decoded_bytes"]:
+                saved = 100.0 * (1 - stats["wire_bytes"] / stats["decoded_bytes"])
+            line = (
+                f"{endpoint}: {stats['requests']} responses, "
+                f"wire {stats['wire_bytes']} B, decoded {stats['decoded_bytes']} B, "
+                f"saved {saved:.1f}%, compressed {stats['compressed']}"
+            )
+            if stats["ignored"]:
+                line += f", uncompressed despite Accept-Encoding: {stats['ignored']}"
+            lines.append(line)
+        return lines
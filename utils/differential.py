@@ -0,0 +1,246 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.api_client import UUID_RE, created_id
+from utils.stats import quantile
+
+# Поля, которые у разных инстансов сервиса заведомо различаются
+IGNORED_FIELDS = ("id", "createdAt")
+DEFAULT_THRESHOLD = 0.2
+
+
+def normalize(value, ignored=IGNORED_FIELDS):
+    """Тело ответа без id/createdAt, с <id> вместо UUID в строках и упорядоченными списками"""
+    if isinstance(value, dict):
+        return {key: normalize(item, ignored) for key, item in value.items() if key not in ignored}
+    if isinstance(value, list):
+        items = [normalize(item, ignored) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, ensure_ascii=False))
+    if isinstance(value, str):
+        return UUID_RE.sub("<id>", value)
+    return value
+
+
+def diff_paths(left, right, path="$"):
+    """Пути (в нотации $.a[0].b), по которым два JSON-значения различаются"""
+    if isinstance(left, dict) and isinstance(right, dict):
+        paths = []
+        for key in sorted(set(left) | set(right)):
+            if key not in left or key not in right:
+                paths.append(f"{path}.{key}")
+            else:
+                paths += diff_paths(left[key], right[key], f"{path}.{key}")
+        return paths
+    if isinstance(left, list) and isinstance(right, list):
+        if len(left) != len(right):
+            return [f"{path}[len {len(left)} != {len(right)}]"]
+        paths = []
+        for index, (left_item, right_item) in enumerate(zip(left, right)):
+            paths += diff_paths(left_item, right_item, f"{path}[{index}]")
+        return paths
+    return [] if left == right else [path]
+
+
+def _body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+class CallResult:
+    """Результат вызова на одном инстансе: ответ или исключение и длительность"""
+
+    def __init__(self, response=None, error=None, duration=0.0):
+        self.response = response
+        self.error = error
+        self.duration = duration
+
+    @property
+    def status(self):
+        if self.error is not None:
+            return f"error:{type(self.error).__name__}"
+        return self.response.status_code
+
+
+class DiffRecorder:
+    """
+    Накопитель расхождений и длительностей по эндпоинтам для двух инстансов
+    (baseline - текущая сборка, candidate - новая).
+    """
+
+    def __init__(self, baseline_url, candidate_url, threshold=DEFAULT_THRESHOLD):
+        self.baseline_url = baseline_url
+        self.candidate_url = candidate_url
+        self.threshold = threshold
+        self.durations = {}
+        self.calls = {}
+        self.mismatches = []
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, call, baseline, candidate):
+        mismatch = None
+        if baseline.status != candidate.status:
+            mismatch = {"kind": "status", "baseline": baseline.status,
+                        "candidate": candidate.status}
+        elif baseline.error is None:
+            paths = diff_paths(normalize(_body(baseline.response)),
+                               normalize(_body(candidate.response)))
+            if paths:
+                mismatch = {"kind": "body", "paths": paths[:20]}
+
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            durations = self.durations.setdefault(endpoint, ([], []))
+            if baseline.error is None:
+                durations[0].append(baseline.duration)
+            if candidate.error is None:
+                durations[1].append(candidate.duration)
+            if mismatch is not None:
+                mismatch.update({"endpoint": endpoint, "call": call})
+                self.mismatches.append(mismatch)
+
+    def record_id_mapping_failure(self, call, baseline, candidate):
+        """create_item прошёл на обоих инстансах, но id объявлений не удалось сопоставить"""
+        with self._lock:
+            self.mismatches.append({
+                "kind": "id_mapping", "endpoint": "create_item", "call": call,
+                "baseline": _body(baseline.response), "candidate": _body(candidate.response),
+            })
+
+    def latency(self):
+        """Сравнение квантилей длительности по эндпоинтам"""
+        rows = []
+        with self._lock:
+            items = sorted((endpoint, (sorted(base), sorted(cand)))
+                           for endpoint, (base, cand) in self.durations.items())
+        for endpoint, (base, cand) in items:
+            row = {"endpoint": endpoint, "calls": self.calls[endpoint], "regression": False}
+            for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                row[name] = (quantile(base, q), quantile(cand, q))
+            for name in ("p50", "p95"):
+                base_value, cand_value = row[name]
+                if base_value and cand_value and cand_value > base_value * (1 + self.threshold):
+                    row["regression"] = True
+            rows.append(row)
+        return rows
+
+    def report(self):
+        latency = self.latency()
+        return {
+            "baseline": self.baseline_url,
+            "candidate": self.candidate_url,
+            "threshold": self.threshold,
+            "latency": latency,
+            "mismatches": list(self.mismatches),
+            "regressed": bool(self.mismatches) or any(row["regression"] for row in latency),
+        }
+
+    def lines(self):
+        report = self.report()
+        lines = [f"baseline {report['baseline']} vs candidate {report['candidate']}"]
+
+        def ms(value):
+            return "-" if value is None else f"{value * 1000:.1f}"
+
+        for row in report["latency"]:
+            marker = "  REGRESSION" if row["regression"] else ""
+            lines.append(
+                f"{row['endpoint']}: {row['calls']} calls, ms p50 {ms(row['p50'][0])} -> "
+                f"{ms(row['p50'][1])}, p95 {ms(row['p95'][0])} -> {ms(row['p95'][1])}, "
+                f"p99 {ms(row['p99'][0])} -> {ms(row['p99'][1])}{marker}"
+            )
+        for mismatch in report["mismatches"]:
+            if mismatch["kind"] == "status":
+                details = f"status {mismatch['baseline']} != {mismatch['candidate']}"
+            elif mismatch["kind"] == "id_mapping":
+                details = "id mapping failed, later calls use the baseline id for candidate"
+            else:
+                details = "body differs at " + ", ".join(mismatch["paths"])
+            lines.append(f"MISMATCH {mismatch['endpoint']} {mismatch['call']}: {details}")
+        lines.append(f"result: {'REGRESSED' if report['regressed'] else 'OK'}")
+        return lines
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=2, default=str)
+
+
+class DifferentialAPIClient:
+    """
+    Клиент с интерфейсом APIClient, который шлёт каждый вызов одновременно
+    в два инстанса. Тесту возвращается ответ baseline, расхождения и
+    длительности пишутся в DiffRecorder. id объявлений candidate
+    сопоставляются с id baseline по ответам create_item.
+    """
+
+    def __init__(self, baseline, candidate, recorder):
+        self.baseline = baseline
+        self.candidate = candidate
+        self.recorder = recorder
+        self.base_url = baseline.base_url
+        self.headers = baseline.headers
+        self._ids = {}
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+    def _call(self, client, method, *args):
+        started = time.perf_counter()
+        try:
+            response = getattr(client, method)(*args)
+        except Exception as exc:
+            return CallResult(error=exc, duration=time.perf_counter() - started)
+        return CallResult(response=response, duration=time.perf_counter() - started)
+
+    def _both(self, method, args, candidate_args=None, endpoint=None):
+        baseline_future = self._executor.submit(self._call, self.baseline, method, *args)
+        candidate_future = self._executor.submit(
+            self._call, self.candidate, method, *(candidate_args or args)
+        )
+        baseline, candidate = baseline_future.result(), candidate_future.result()
+        call = f"{method}({', '.join(repr(arg) for arg in args)})"
+        self.recorder.record(endpoint or method, call, baseline, candidate)
+        if baseline.error is not None:
+            raise baseline.error
+        return baseline.response, candidate
+
+    def _candidate_id(self, item_id):
+        return self._ids.get(item_id, item_id)
+
+    def create_item(self, data):
+        """POST /api/1/item - Создать объявление"""
+        response, candidate = self._both("create_item", (data,))
+        # При разных статусах расхождение уже записано в _both
+        if candidate.error is None and response.status_code == candidate.status == 200:
+            baseline_id = created_id(_body(response))
+            candidate_id = created_id(_body(candidate.response))
+            if baseline_id is None or candidate_id is None:
+                self.recorder.record_id_mapping_failure(
+                    f"create_item({data!r})", CallResult(response=response), candidate
+                )
+            else:
+                self._ids[baseline_id] = candidate_id
+        return response
+
+    def get_item(self, item_id):
+        """GET /api/1/item/{id} - Получить объявление по ID"""
+        return self._both("get_item", (item_id,), (self._candidate_id(item_id),))[0]
+
+    def get_seller_items(self, seller_id):
+        """GET /api/1/{sellerID}/item - Получить все объявления продавца"""
+        return self._both("get_seller_items", (seller_id,))[0]
+
+    def get_statistic(self, item_id, version=1):
+        """GET /api/{version}/statistic/{id} - Получить статистику"""
+        return self._both(
+            "get_statistic", (item_id, version), (self._candidate_id(item_id), version),
+            endpoint=f"get_statistic_v{version}"
+        )[0]
+
+    def delete_item(self, item_id):
+        """DELETE /api/2/item/{id} - Удалить объявление"""
+        return self._both("delete_item", (item_id,), (self._candidate_id(item_id),))[0]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,281 @@
+import json
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+
+import requests
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from utils.http_server import BackgroundServer
+
+DEFAULT_UPSTREAM_TIMEOUT = 30.0
+
+# Эндпоинты сервиса объявлений: имя -> (HTTP-метод, шаблон пути)
+ENDPOINTS = {
+    "create_item": ("POST", r"^/api/1/item$"),
+    "get_item": ("GET", r"^/api/1/item/[^/]+$"),
+    "get_seller_items": ("GET", r"^/api/1/[^/]+/item$"),
+    "get_statistic": ("GET", r"^/api/\d+/statistic/[^/]+$"),
+    "delete_item": ("DELETE", r"^/api/2/item/[^/]+$"),
+}
+
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+
+def constant(seconds):
+    """Фиксированная задержка"""
+    return lambda rng: seconds
+
+
+def uniform(low, high):
+    """Задержка, равномерно распределённая на [low, high] секунд"""
+    return lambda rng: rng.uniform(low, high)
+
+
+def normal(mean, stddev):
+    """Нормально распределённая задержка (отрицательные значения обрезаются до 0)"""
+    return lambda rng: max(0.0, rng.gauss(mean, stddev))
+
+
+def exponential(mean):
+    """Экспоненциально распределённая задержка со средним mean секунд"""
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+class FaultRule:
+    """
+    Правило внедрения сбоев для запросов, подходящих под endpoint/method/path.
+
+    latency - секунды или функция rng -> секунды (см. constant, uniform, normal, exponential)
+    bandwidth - ограничение скорости отдачи тела ответа, байт/с
+    reset_rate - вероятность оборвать соединение (TCP RST) без ответа
+    error_rate, error_status - вероятность и код подменного ответа (5xx/429)
+    truncate_rate - вероятность отдать только часть тела и закрыть соединение
+    """
+
+    def __init__(self, endpoint=None, method=None, path=None, latency=None,
+                 bandwidth=None, reset_rate=0.0, error_rate=0.0, error_status=503,
+                 retry_after=None, truncate_rate=0.0):
+        if endpoint is not None:
+            if endpoint not in ENDPOINTS:
+                raise ValueError(f"Unknown endpoint: {endpoint}")
+            method, path = ENDPOINTS[endpoint]
+        self.endpoint = endpoint
+        self.method = method
+        self.path = re.compile(path) if path else None
+        self.latency = constant(latency) if isinstance(latency, (int, float)) else latency
+        self.bandwidth = bandwidth
+        self.reset_rate = reset_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.truncate_rate = truncate_rate
+
+    def matches(self, method, path):
+        if self.method is not None and self.method != method:
+            return False
+        return self.path is None or bool(self.path.match(path.split("?", 1)[0]))
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = do_GET
+
+    def _handle(self):
+        proxy = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        rule = proxy.match(self.command, self.path)
+        if rule is None:
+            return self._forward(proxy, body, None, truncate=False)
+
+        latency, reset, error, truncate = proxy.draw(rule)
+        if latency:
+            time.sleep(latency)
+        if reset:
+            proxy.record("reset")
+            return self._reset()
+        if error:
+            proxy.record(f"status_{rule.error_status}")
+            return self._send_error(rule)
+        self._forward(proxy, body, rule, truncate)
+
+    def _forward(self, proxy, body, rule, truncate):
+        headers = {
+            name: value for name, value in self.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        try:
+            upstream = proxy.session.request(
+                self.command, proxy.target + self.path, data=body,
+                headers=headers, stream=True, allow_redirects=False,
+                timeout=proxy.upstream_timeout,
+            )
+            # Тело передаётся как есть (без декодирования), чтобы клиент видел
+            # те же байты, что пришли бы от сервиса напрямую
+            payload = upstream.raw.read(decode_content=False)
+        except (requests.RequestException, Urllib3Error):
+            # Сюда же попадают таймауты: зависший сервис не держит поток прокси
+            proxy.record("upstream_error")
+            self._send_json(502, {"message": "proxy: upstream unavailable"})
+            return
+
+        self.send_response(upstream.status_code)
+        for name, value in upstream.headers.items():
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+
+        if truncate and payload:
+            proxy.record("truncated")
+            self._write(payload[:len(payload) // 2], rule.bandwidth)
+            self.wfile.flush()
+            self._reset()
+            return
+        proxy.record("forwarded")
+        self._write(payload, rule.bandwidth if rule else None)
+
+    def _write(self, payload, bandwidth):
+        if not bandwidth:
+            self.wfile.write(payload)
+            return
+        chunk_size = max(1, int(bandwidth) // 20)
+        for start in range(0, len(payload), chunk_size):
+            chunk = payload[start:start + chunk_size]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / bandwidth)
+
+    def _send_error(self, rule):
+        body = json.dumps({"message": "injected fault"}).encode("utf-8")
+        self.send_response(rule.error_status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if rule.retry_after is not None:
+            self.send_header("Retry-After", str(rule.retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reset(self):
+        # SO_LINGER с нулевым таймаутом: close() отправляет RST вместо FIN
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_RD)
+        except OSError:
+            pass
+        self.connection.close()
+
+
+class FaultProxy(BackgroundServer):
+    """
+    Локальный программируемый прокси между клиентом и сервисом.
+    Для каждого запроса применяет первое подходящее правило FaultRule
+    и внедряет задержку, ограничение полосы, обрыв соединения,
+    подменный 5xx/429 или обрезанное тело ответа.
+
+    seed делает последовательность внедрённых сбоев воспроизводимой.
+    upstream_timeout ограничивает подключение к сервису и каждое чтение ответа;
+    по истечении клиент получает 502.
+    """
+
+    handler_class = _ProxyHandler
+
+    def __init__(self, target, seed=None, host="127.0.0.1", port=0,
+                 upstream_timeout=DEFAULT_UPSTREAM_TIMEOUT):
+        super().__init__(host, port)
+        self.target = target.rstrip("/")
+        self.upstream_timeout = upstream_timeout
+        self.session = requests.Session()
+        self.rules = []
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def add_rule(self, rule=None, **kwargs):
+        """Добавить правило (готовый FaultRule или параметры для него)"""
+        rule = rule or FaultRule(**kwargs)
+        with self._lock:
+            self.rules.append(rule)
+        return rule
+
+    def remove_rule(self, rule):
+        with self._lock:
+            if rule in self.rules:
+                self.rules.remove(rule)
+
+    def clear(self):
+        """Убрать все правила и сбросить статистику"""
+        with self._lock:
+            self.rules = []
+            self.stats = Counter()
+
+    def reseed(self, seed):
+        with self._lock:
+            self._rng = random.Random(seed)
+
+    @contextmanager
+    def scenario(self, *rules, **kwargs):
+        """
+        Временно включить правила на время блока with:
+
+            with fault_proxy.scenario(endpoint="get_item", error_rate=1.0, error_status=429):
+                ...
+        """
+        added = [self.add_rule(rule) for rule in rules]
+        if kwargs:
+            added.append(self.add_rule(**kwargs))
+        try:
+            yield self
+        finally:
+            for rule in added:
+                self.remove_rule(rule)
+
+    def match(self, method, path):
+        with self._lock:
+            for rule in self.rules:
+                if rule.matches(method, path):
+                    return rule
+        return None
+
+    def draw(self, rule):
+        """Разыграть сбои для одного запроса: (задержка, обрыв, ошибка, обрезка)"""
+        with self._lock:
+            latency = rule.latency(self._rng) if rule.latency else 0.0
+            reset = self._rng.random() < rule.reset_rate
+            error = self._rng.random() < rule.error_rate
+            truncate = self._rng.random() < rule.truncate_rate
+        return latency, reset, error, truncate
+
+    def record(self, event):
+        with self._lock:
+            self.stats[event] += 1
+
+    def stop(self):
+        super().stop()
+        self.session.close()
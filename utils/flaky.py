@@ -0,0 +1,269 @@
+"""
+pytest-плагин для выявления нестабильных тестов.
+
+Упавшие в основном прогоне тесты перезапускаются --flaky-reruns раз,
+параллельно, каждый перезапуск - в отдельном процессе pytest. По итогам
+тест классифицируется:
+
+- deterministic - не прошёл ни в одном перезапуске;
+- flaky - прошёл хотя бы в одном перезапуске;
+- outage - в момент падения (или во время перезапусков, если не прошёл ни один)
+  сервис недоступен целиком: все эндпоинты не отвечают или отдают 5xx.
+
+Сервис проверяется сразу при падении в основном прогоне (не чаще раза в
+PROBE_INTERVAL секунд), поэтому падения во время простоя не считаются flaky,
+даже если к перезапускам сервис поднялся.
+
+Для каждого теста в --flaky-db хранится flakiness score (скользящее среднее
+признака «flaky»), тесты со score не ниже --flaky-threshold попадают в список
+quarantine. С --flaky-quarantine такие тесты помечаются xfail(strict=False).
+"""
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCORE_ALPHA = 0.3
+PROBE_INTERVAL = 30.0
+
+# Опции основного прогона, которые не передаются в перезапуски: опции плагинов
+# отчётов (перезапуск перезаписал бы файлы) и параллельного запуска xdist
+DROPPED_PREFIXES = ("--flaky-", "--stream-")
+DROPPED_OPTIONS = {"--junitxml", "--junit-xml", "--junitprefix", "--junit-prefix", "--html", "--css",
+                   "--compare-report", "-n", "--numprocesses", "--dist", "--maxprocesses"}
+DROPPED_FLAGS = {"--flaky-quarantine", "--self-contained-html", "--lf", "--last-failed",
+                 "--ff", "--failed-first", "--sw", "--stepwise", "-x", "--exitfirst"}
+
+# Запросы без побочных эффектов, покрывающие все группы эндпоинтов
+PROBES = (
+    "/api/1/item/{uuid}",
+    "/api/1/{seller_id}/item",
+    "/api/1/statistic/{uuid}",
+    "/api/2/statistic/{uuid}",
+)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("flaky", "Выявление нестабильных тестов")
+    group.addoption("--flaky-reruns", type=int, default=0,
+                    help="Сколько раз перезапускать каждый упавший тест (0 - выключено)")
+    group.addoption("--flaky-workers", type=int, default=4,
+                    help="Сколько перезапусков выполнять одновременно")
+    group.addoption("--flaky-db", default=".flaky.json",
+                    help="Файл с flakiness score тестов")
+    group.addoption("--flaky-threshold", type=float, default=0.3,
+                    help="Score, начиная с которого тест попадает в quarantine")
+    group.addoption("--flaky-quarantine", action="store_true", default=False,
+                    help="Помечать тесты из quarantine как xfail(strict=False)")
+    group.addoption("--flaky-probe-url", default=None,
+                    help="Адрес сервиса для проверки на outage (по умолчанию --base-url)")
+
+
+def pytest_configure(config):
+    # В xdist-воркерах плагин не нужен: отчёты собирает контроллер
+    if hasattr(config, "workerinput"):
+        return
+    reruns = config.getoption("--flaky-reruns")
+    if reruns > 0 or config.getoption("--flaky-quarantine"):
+        config.pluginmanager.register(FlakinessPlugin(config), "flakiness-plugin")
+
+
+def service_is_down(base_url, timeout=5.0):
+    """True, если ни один эндпоинт сервиса не ответил без 5xx"""
+    session = requests.Session()
+    try:
+        for path in PROBES:
+            url = base_url.rstrip("/") + path.format(uuid=uuid.uuid4(), seller_id=111111)
+            try:
+                response = session.get(url, headers={"Accept": "application/json"}, timeout=timeout)
+            except requests.RequestException:
+                continue
+            if response.status_code < 500:
+                return False
+        return True
+    finally:
+        session.close()
+
+
+def classify(passes, outage):
+    if outage:
+        return "outage"
+    if passes == 0:
+        return "deterministic"
+    return "flaky"
+
+
+class FlakinessDB:
+    """JSON-файл со score и историей классификаций по nodeid"""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {"tests": {}, "quarantine": []}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.data = json.load(file)
+
+    @property
+    def quarantine(self):
+        return set(self.data.get("quarantine", []))
+
+    def update(self, nodeid, flaky, classification=None):
+        entry = self.data["tests"].setdefault(nodeid, {"score": 0.0, "runs": 0, "flaky": 0})
+        entry["runs"] += 1
+        entry["flaky"] += int(flaky)
+        entry["score"] = round((1 - SCORE_ALPHA) * entry["score"] + SCORE_ALPHA * int(flaky), 4)
+        if classification is not None:
+            entry["last"] = classification
+            entry["last_seen"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return entry["score"]
+
+    def save(self, threshold):
+        self.data["quarantine"] = sorted(
+            nodeid for nodeid, entry in self.data["tests"].items() if entry["score"] >= threshold
+        )
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.data, file, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class FlakinessPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.reruns = config.getoption("--flaky-reruns")
+        self.workers = config.getoption("--flaky-workers")
+        self.threshold = config.getoption("--flaky-threshold")
+        self.db = FlakinessDB(config.getoption("--flaky-db"))
+        self.failed = []
+        self.passed = set()
+        self.results = {}
+        self.outage = False
+        # Состояние сервиса в момент падения каждого теста основного прогона
+        self.down_at_failure = {}
+        self._last_probe = None
+
+    def pytest_collection_modifyitems(self, items):
+        if not self.config.getoption("--flaky-quarantine"):
+            return
+        quarantine = self.db.quarantine
+        for item in items:
+            if item.nodeid in quarantine:
+                item.add_marker(pytest.mark.xfail(reason="quarantined as flaky", strict=False))
+
+    def _service_down_now(self):
+        """Проверка сервиса с кэшем на PROBE_INTERVAL секунд (None - нечем проверять)"""
+        now = time.monotonic()
+        if self._last_probe is None or now - self._last_probe[0] >= PROBE_INTERVAL:
+            probe_url = self._probe_url()
+            self._last_probe = (now, bool(probe_url) and service_is_down(probe_url))
+        return self._last_probe[1]
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed and report.nodeid not in self.failed:
+            self.failed.append(report.nodeid)
+            self.passed.discard(report.nodeid)
+            if self.reruns > 0:
+                self.down_at_failure[report.nodeid] = self._service_down_now()
+        elif report.when == "call" and report.passed and report.nodeid not in self.failed:
+            self.passed.add(report.nodeid)
+
+    def _probe_url(self):
+        url = self.config.getoption("--flaky-probe-url")
+        if url is None:
+            try:
+                url = self.config.getoption("--base-url")
+            except ValueError:
+                url = None
+        return url
+
+    def _rerun_args(self):
+        """
+        Аргументы основного прогона (addopts, PYTEST_ADDOPTS и командная строка)
+        без путей к тестам, опций этого плагина, потоковых отчётов и прочих
+        файлов отчётов, которые перезапуск перезаписал бы
+        """
+        args = list(self.config.getini("addopts"))
+        args += shlex.split(os.environ.get("PYTEST_ADDOPTS", ""))
+        args += [str(arg) for arg in self.config.invocation_params.args]
+        paths = set()
+        if self.config.args_source == pytest.Config.ArgsSource.ARGS:
+            paths = {str(arg) for arg in self.config.args}
+        result = []
+        skip_value = False
+        for arg in args:
+            if skip_value:
+                skip_value = False
+                continue
+            name = arg.split("=", 1)[0]
+            if name.startswith(DROPPED_PREFIXES) or name in DROPPED_OPTIONS:
+                skip_value = "=" not in arg and name not in DROPPED_FLAGS
+                continue
+            if name in DROPPED_FLAGS or (arg.startswith("-n") and not arg.startswith("--")):
+                # -n4 / -nauto - слитная форма опции xdist
+                continue
+            if arg in paths:
+                continue
+            result.append(arg)
+        return result
+
+    def _rerun_command(self, nodeid):
+        return [sys.executable, "-m", "pytest", nodeid, "-q", "-p", "no:cacheprovider",
+                "-p", "utils.flaky", "-o", "addopts="] + self._rerun_args() + ["--flaky-reruns=0"]
+
+    def _rerun(self, nodeid):
+        env = dict(os.environ)
+        env.pop("PYTEST_ADDOPTS", None)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+        result = subprocess.run(
+            self._rerun_command(nodeid), cwd=str(self.config.rootpath), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return nodeid, result.returncode == 0
+
+    def pytest_sessionfinish(self, session):
+        if self.reruns > 0 and self.failed:
+            jobs = [nodeid for nodeid in self.failed for _ in range(self.reruns)]
+            passes = {nodeid: 0 for nodeid in self.failed}
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+                for nodeid, passed in executor.map(self._rerun, jobs):
+                    passes[nodeid] += int(passed)
+
+            probe_url = self._probe_url()
+            all_failed = not any(passes.values())
+            # После перезапусков сервис проверяется, только когда не прошёл ни один:
+            # при частичных успехах он заведомо доступен
+            self.outage = bool(probe_url) and all_failed and service_is_down(probe_url)
+            for nodeid in self.failed:
+                outage = self.outage or self.down_at_failure.get(nodeid, False)
+                classification = classify(passes[nodeid], outage)
+                score = None
+                if classification != "outage":
+                    score = self.db.update(nodeid, classification == "flaky", classification)
+                self.results[nodeid] = (classification, passes[nodeid], score)
+
+        for nodeid in self.passed:
+            self.db.update(nodeid, False)
+        self.db.save(self.threshold)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        terminalreporter.write_sep("-", "flakiness")
+        for nodeid, (classification, passes, score) in self.results.items():
+            line = f"{classification:<13} {passes}/{self.reruns} reruns passed  {nodeid}"
+            if score is not None:
+                line += f"  (score {score:.2f})"
+            terminalreporter.write_line(line)
+        quarantine = self.db.quarantine
+        if quarantine:
+            terminalreporter.write_line(f"quarantine ({len(quarantine)}): " + ", ".join(sorted(quarantine)))
@@ -0,0 +1,59 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    # По умолчанию backlog 5: при десятках одновременных подключений лишние SYN
+    # отбрасываются, и клиент ждёт повторной отправки около секунды
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class BackgroundServer:
+    """
+    Базовый локальный HTTP-сервер, работающий в фоновом потоке.
+    Наследники задают handler_class и при необходимости переопределяют make_server().
+    """
+
+    handler_class = None
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def make_server(self):
+        server = _Server((self.host, self.port), self.handler_class)
+        server.owner = self
+        return server
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        if self._server is not None:
+            return self
+        self._server = self.make_server()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,273 @@
+"""
+Синтетический мониторинг: тесты с маркером smoke гоняются в одном процессе
+с фиксированным интервалом, без повторного запуска pytest.
+
+    python -m utils.smoke_monitor --base-url https://qa-internship.avito.com \
+        --interval 60 --port 9108 --metrics-file smoke.prom
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+from utils.http_server import BackgroundServer
+from utils.stats import quantile
+
+DEFAULT_WINDOWS = (300, 3600)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class ProbeStats:
+    """Скользящие окна результатов одной пробы: (время, длительность, успех)"""
+
+    def __init__(self, windows=DEFAULT_WINDOWS):
+        self.windows = tuple(sorted(windows))
+        self.samples = deque()
+        self.outcomes = {"passed": 0, "failed": 0, "skipped": 0}
+        self.last_ok = None
+        self.last_duration = None
+        self.last_timestamp = None
+
+    def add(self, timestamp, duration, outcome):
+        self.outcomes[outcome] += 1
+        if outcome == "skipped":
+            return
+        ok = outcome == "passed"
+        self.samples.append((timestamp, duration, ok))
+        self.last_ok, self.last_duration, self.last_timestamp = ok, duration, timestamp
+        horizon = timestamp - self.windows[-1]
+        while self.samples and self.samples[0][0] < horizon:
+            self.samples.popleft()
+
+    def window(self, seconds, now=None):
+        """(доступность, отсортированные длительности) за последние seconds секунд"""
+        now = time.time() if now is None else now
+        recent = [sample for sample in self.samples if sample[0] >= now - seconds]
+        if not recent:
+            return None, []
+        availability = sum(1 for sample in recent if sample[2]) / len(recent)
+        return availability, sorted(sample[1] for sample in recent)
+
+
+class SmokeMetrics:
+    """Метрики всех проб и их вывод в текстовом формате Prometheus"""
+
+    def __init__(self, windows=DEFAULT_WINDOWS):
+        self.windows = tuple(sorted(windows))
+        self.probes = {}
+        self.cycles = 0
+        self._lock = threading.Lock()
+
+    def record(self, probe, duration, outcome, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            stats = self.probes.setdefault(probe, ProbeStats(self.windows))
+            stats.add(timestamp, duration, outcome)
+
+    def finish_cycle(self):
+        with self._lock:
+            self.cycles += 1
+
+    def render(self, now=None):
+        now = time.time() if now is None else now
+        lines = [
+            "# HELP smoke_monitor_cycles_total Completed smoke cycles.",
+            "# TYPE smoke_monitor_cycles_total counter",
+            f"smoke_monitor_cycles_total {self.cycles}",
+        ]
+        with self._lock:
+            probes = sorted(self.probes.items())
+            up, runs, last_duration, last_run, availability, latency = [], [], [], [], [], []
+            for probe, stats in probes:
+                label = f'probe="{_escape(probe)}"'
+                for outcome, count in sorted(stats.outcomes.items()):
+                    runs.append(f'smoke_probe_runs_total{{{label},outcome="{outcome}"}} {count}')
+                if stats.last_ok is None:
+                    continue
+                up.append(f"smoke_probe_up{{{label}}} {int(stats.last_ok)}")
+                last_duration.append(
+                    f"smoke_probe_last_duration_seconds{{{label}}} {stats.last_duration:.6f}"
+                )
+                last_run.append(
+                    f"smoke_probe_last_run_timestamp_seconds{{{label}}} {stats.last_timestamp:.3f}"
+                )
+                for window in self.windows:
+                    ratio, durations = stats.window(window, now)
+                    if ratio is None:
+                        continue
+                    window_label = f'{label},window="{window}s"'
+                    availability.append(
+                        f"smoke_probe_availability_ratio{{{window_label}}} {ratio:.6f}"
+                    )
+                    for q in QUANTILES:
+                        latency.append(
+                            f'smoke_probe_latency_seconds{{{window_label},quantile="{q}"}} '
+                            f"{quantile(durations, q):.6f}"
+                        )
+                    latency.append(
+                        f"smoke_probe_latency_seconds_count{{{window_label}}} {len(durations)}"
+                    )
+                    latency.append(
+                        f"smoke_probe_latency_seconds_sum{{{window_label}}} {sum(durations):.6f}"
+                    )
+
+        families = [
+            ("smoke_probe_up", "gauge", "Last probe result (1 - passed).", up),
+            ("smoke_probe_runs_total", "counter", "Probe runs by outcome.", runs),
+            ("smoke_probe_last_duration_seconds", "gauge", "Duration of the last probe run.",
+             last_duration),
+            ("smoke_probe_last_run_timestamp_seconds", "gauge", "Unix time of the last probe run.",
+             last_run),
+            ("smoke_probe_availability_ratio", "gauge", "Share of passed runs in the window.",
+             availability),
+            ("smoke_probe_latency_seconds", "summary", "Probe duration quantiles in the window.",
+             latency),
+        ]
+        for name, metric_type, help_text, samples in families:
+            if samples:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"] + samples
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Атомарная запись в файл (формат textfile-коллектора node_exporter)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(tmp_path, path)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.owner.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(BackgroundServer):
+    """HTTP-эндпоинт /metrics для Prometheus"""
+
+    handler_class = _MetricsHandler
+
+    def __init__(self, metrics, host="127.0.0.1", port=0):
+        super().__init__(host, port)
+        self.metrics = metrics
+
+
+class SmokeMonitorPlugin:
+    """
+    pytest-плагин, подменяющий основной цикл: собранные тесты прогоняются
+    по кругу, пока не будет вызван stop() или не пройдёт заданное число циклов.
+    Фикстуры уровня сессии живут между циклами.
+    """
+
+    def __init__(self, metrics, interval=60.0, cycles=0, metrics_file=None):
+        self.metrics = metrics
+        self.interval = interval
+        self.cycles = cycles
+        self.metrics_file = metrics_file
+        self._stop = threading.Event()
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def run_cycle(self, items):
+        for index, item in enumerate(items):
+            # Последний тест цикла передаёт управление первому тесту следующего,
+            # поэтому session-фикстуры (прогретая HTTP-сессия) не пересоздаются
+            nextitem = items[index + 1] if index + 1 < len(items) else items[0]
+            if nextitem is item:
+                # Единственная проба: function-фикстуры снимаются до родителя,
+                # иначе в следующем цикле они не будут созданы заново
+                nextitem = item.parent
+            started = time.perf_counter()
+            reports = runtestprotocol(item, nextitem=nextitem, log=False)
+            duration = time.perf_counter() - started
+            if any(report.failed for report in reports):
+                outcome = "failed"
+            elif any(report.skipped for report in reports):
+                outcome = "skipped"
+            else:
+                outcome = "passed"
+            self.metrics.record(item.nodeid, duration, outcome)
+        self.metrics.finish_cycle()
+        if self.metrics_file:
+            self.metrics.write(self.metrics_file)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        items = session.items
+        if not items:
+            return True
+        try:
+            while not self._stop.is_set():
+                cycle_started = time.monotonic()
+                self.run_cycle(items)
+                if self.cycles and self.metrics.cycles >= self.cycles:
+                    break
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - cycle_started)))
+        finally:
+            session._setupstate.teardown_exact(None)
+        return True
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Синтетический мониторинг smoke-тестами")
+    parser.add_argument("--base-url", help="Адрес сервиса (по умолчанию BASE_URL из utils/api_client.py)")
+    parser.add_argument("--interval", type=float, default=60.0, help="Период цикла, секунды")
+    parser.add_argument("--cycles", type=int, default=0, help="Число циклов (0 - бесконечно)")
+    parser.add_argument(
+        "--windows", default=",".join(str(window) for window in DEFAULT_WINDOWS),
+        help="Скользящие окна для доступности и задержек, секунды через запятую"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес для /metrics")
+    parser.add_argument("--port", type=int, help="Порт для /metrics (без него HTTP не поднимается)")
+    parser.add_argument("--metrics-file", help="Файл, в который метрики пишутся после каждого цикла")
+    parser.add_argument("pytest_args", nargs="*", help="Дополнительные аргументы pytest")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    windows = [int(window) for window in args.windows.split(",") if window.strip()]
+    metrics = SmokeMetrics(windows)
+    plugin = SmokeMonitorPlugin(metrics, args.interval, args.cycles, args.metrics_file)
+    signal.signal(signal.SIGTERM, plugin.stop)
+
+    pytest_args = ["-m", "smoke", "-q", "-p", "no:cacheprovider"]
+    if args.base_url:
+        pytest_args += ["--base-url", args.base_url]
+    pytest_args += args.pytest_args
+
+    server = None
+    if args.port is not None:
+        server = MetricsServer(metrics, args.host, args.port).start()
+        print(f"smoke monitor metrics: {server.url}/metrics", flush=True)
+    try:
+        return pytest.main(pytest_args, plugins=[plugin])
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Длительный (soak) прогон: цикл create -> get -> seller list -> statistic -> delete
+через методы APIClient с окнами статистики по времени.
+
+    python -m utils.soak --duration 14400 --window 300 --report soak.jsonl
+
+По каждому окну считаются квантили длительности операций, RSS процесса
+и рост памяти по tracemalloc с топом мест выделения. Дрейф относительно
+первых окон сверх порогов помечается в отчёте и даёт код возврата 1.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+import requests
+
+try:
+    import resource
+except ImportError:  # нет на Windows
+    resource = None
+
+from utils.api_client import APIClient, BASE_URL, created_id
+from utils.stats import quantile
+from utils.warmup import create_session
+
+OPERATIONS = ("create_item", "get_item", "get_seller_items", "get_statistic", "delete_item")
+
+
+def rss_bytes():
+    """Текущий RSS процесса (на Linux из /proc, иначе пиковый из getrusage)"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class WindowStats:
+    """Длительности и ошибки операций за одно окно"""
+
+    def __init__(self, index, started):
+        self.index = index
+        self.started = started
+        self.iterations = 0
+        self.latencies = {operation: [] for operation in OPERATIONS}
+        self.errors = {operation: 0 for operation in OPERATIONS}
+
+    def summary(self):
+        operations = {}
+        for operation in OPERATIONS:
+            values = sorted(self.latencies[operation])
+            operations[operation] = {
+                "count": len(values),
+                "errors": self.errors[operation],
+                "p50": quantile(values, 0.5),
+                "p95": quantile(values, 0.95),
+                "p99": quantile(values, 0.99),
+            }
+        return {"window": self.index, "started": self.started,
+                "iterations": self.iterations, "operations": operations}
+
+
+class DriftDetector:
+    """
+    Сравнение окон с базой - средним по первым baseline_windows окнам.
+    latency_threshold - допустимый относительный рост p95 (0.5 = +50%),
+    rss_threshold_mb и traced_threshold_mb - допустимый рост памяти.
+    """
+
+    def __init__(self, latency_threshold=0.5, rss_threshold_mb=50.0,
+                 traced_threshold_mb=20.0, baseline_windows=1):
+        self.latency_threshold = latency_threshold
+        self.rss_threshold = rss_threshold_mb * 1024 * 1024
+        self.traced_threshold = traced_threshold_mb * 1024 * 1024
+        self.baseline_windows = baseline_windows
+        self._history = []
+        self.baseline = None
+
+    def _build_baseline(self):
+        baseline = {"p95": {}}
+        for operation in OPERATIONS:
+            values = [window["operations"][operation]["p95"] for window in self._history
+                      if window["operations"][operation]["p95"] is not None]
+            baseline["p95"][operation] = sum(values) / len(values) if values else None
+        for key in ("rss_bytes", "traced_bytes"):
+            values = [window[key] for window in self._history if window.get(key) is not None]
+            baseline[key] = sum(values) / len(values) if values else None
+        return baseline
+
+    def check(self, window):
+        """Список найденных дрейфов для окна (пустой, пока набирается база)"""
+        if self.baseline is None:
+            self._history.append(window)
+            if len(self._history) >= self.baseline_windows:
+                self.baseline = self._build_baseline()
+            return []
+
+        flags = []
+        for operation in OPERATIONS:
+            base = self.baseline["p95"][operation]
+            current = window["operations"][operation]["p95"]
+            if base and current and current > base * (1 + self.latency_threshold):
+                flags.append(
+                    f"{operation} p95 {current * 1000:.1f}ms > baseline {base * 1000:.1f}ms "
+                    f"+{self.latency_threshold:.0%}"
+                )
+        for key, threshold, label in (("rss_bytes", self.rss_threshold, "rss"),
+                                      ("traced_bytes", self.traced_threshold, "tracemalloc")):
+            base, current = self.baseline.get(key), window.get(key)
+            if base is not None and current is not None and current - base > threshold:
+                flags.append(
+                    f"{label} grew by {(current - base) / 1024 / 1024:.1f}MB "
+                    f"(threshold {threshold / 1024 / 1024:.1f}MB)"
+                )
+        return flags
+
+
+class SoakRunner:
+    """
+    Цикл операций в течение duration секунд с закрытием окна каждые window секунд.
+    При неудачном создании объявления итерация прерывается и выдерживается
+    пауза error_pause, чтобы недоступный сервис не превращался в busy loop.
+    """
+
+    def __init__(self, client, duration=3600.0, window=60.0, detector=None,
+                 report=None, trace_memory=True, top_allocators=5, error_pause=1.0):
+        self.client = client
+        self.duration = duration
+        self.window = window
+        self.detector = detector or DriftDetector()
+        self.report = report
+        self.trace_memory = trace_memory
+        self.top_allocators = top_allocators
+        self.error_pause = error_pause
+        self.windows = []
+        self.drifted = False
+        self._start_snapshot = None
+
+    def _timed(self, stats, operation, call, *args):
+        started = time.perf_counter()
+        try:
+            response = call(*args)
+        except requests.RequestException:
+            stats.errors[operation] += 1
+            return None
+        stats.latencies[operation].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            stats.errors[operation] += 1
+            return None
+        return response
+
+    def iteration(self, stats):
+        seller_id = random.randint(111111, 999999)
+        response = self._timed(stats, "create_item", self.client.create_item, {
+            "sellerID": seller_id,
+            "name": f"Soak Item {uuid.uuid4().hex[:8]}",
+            "price": random.randint(100, 10000),
+            "statistics": {"likes": 0, "viewCount": 0, "contacts": 0}
+        })
+        item_id = None
+        if response is not None:
+            # Реальный сервис отдаёт id только в тексте status (BUGS.md #8)
+            try:
+                item_id = created_id(response.json())
+            except ValueError:
+                pass
+            if item_id is None:
+                stats.errors["create_item"] += 1
+        if item_id is None:
+            time.sleep(self.error_pause)
+            return
+        # Ответы не сохраняются между итерациями, поэтому устойчивый рост памяти - признак утечки
+        self._timed(stats, "get_item", self.client.get_item, item_id)
+        self._timed(stats, "get_seller_items", self.client.get_seller_items, seller_id)
+        self._timed(stats, "get_statistic", self.client.get_statistic, item_id)
+        self._timed(stats, "delete_item", self.client.delete_item, item_id)
+        stats.iterations += 1
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+
+    def close_window(self, stats):
+        summary = stats.summary()
+        summary["rss_bytes"] = rss_bytes()
+        if self.trace_memory and tracemalloc.is_tracing():
+            snapshot = self._snapshot()
+            summary["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+            summary["top_allocators"] = [
+                str(stat) for stat in snapshot.compare_to(self._start_snapshot, "lineno")[:self.top_allocators]
+            ]
+        summary["drift"] = self.detector.check(summary)
+        self.drifted = self.drifted or bool(summary["drift"])
+        self.windows.append(summary)
+        if self.report is not None:
+            self.report.write(json.dumps(summary, ensure_ascii=False) + "\n")
+            self.report.flush()
+        return summary
+
+    def run(self, on_window=None):
+        started_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        if self.trace_memory:
+            self._start_snapshot = self._snapshot()
+        try:
+            deadline = time.monotonic() + self.duration
+            index = 0
+            stats = WindowStats(index, time.time())
+            window_end = time.monotonic() + self.window
+            while time.monotonic() < deadline:
+                self.iteration(stats)
+                if time.monotonic() >= window_end:
+                    summary = self.close_window(stats)
+                    if on_window is not None:
+                        on_window(summary)
+                    index += 1
+                    stats = WindowStats(index, time.time())
+                    window_end = time.monotonic() + self.window
+            if stats.iterations or any(stats.errors.values()):
+                summary = self.close_window(stats)
+                if on_window is not None:
+                    on_window(summary)
+        finally:
+            self._start_snapshot = None
+            if started_tracing:
+                tracemalloc.stop()
+        return self.windows
+
+
+def format_window(summary):
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.1f}"
+
+    lines = [
+        f"window {summary['window']}: {summary['iterations']} iterations"
+        + (f", rss {summary['rss_bytes'] / 1024 / 1024:.1f}MB" if summary["rss_bytes"] else "")
+        + (f", traced {summary['traced_bytes'] / 1024 / 1024:.1f}MB" if "traced_bytes" in summary else "")
+    ]
+    for operation, stats in summary["operations"].items():
+        lines.append(
+            f"  {operation}: p50 {ms(stats['p50'])} p95 {ms(stats['p95'])} "
+            f"p99 {ms(stats['p99'])} ms, errors {stats['errors']}"
+        )
+    for flag in summary["drift"]:
+        lines.append(f"  DRIFT {flag}")
+    return "\n".join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Длительный прогон с контролем дрейфа")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--duration", type=float, default=3600.0, help="Длительность, секунды")
+    parser.add_argument("--window", type=float, default=60.0, help="Размер окна, секунды")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--baseline-windows", type=int, default=1,
+                        help="Сколько первых окон образуют базу для сравнения")
+    parser.add_argument("--latency-threshold", type=float, default=0.5,
+                        help="Допустимый рост p95 относительно базы (доля)")
+    parser.add_argument("--rss-threshold-mb", type=float, default=50.0)
+    parser.add_argument("--traced-threshold-mb", type=float, default=20.0)
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Не включать tracemalloc (меньше накладных расходов)")
+    parser.add_argument("--top-allocators", type=int, default=5)
+    parser.add_argument("--report", help="Файл для окон в формате JSON Lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    session = create_session()
+    client = APIClient(args.base_url, timeout=args.timeout, session=session)
+    detector = DriftDetector(args.latency_threshold, args.rss_threshold_mb,
+                             args.traced_threshold_mb, args.baseline_windows)
+    report = open(args.report, "a", encoding="utf-8") if args.report else None
+    try:
+        runner = SoakRunner(client, args.duration, args.window, detector, report,
+                            trace_memory=not args.no_tracemalloc,
+                            top_allocators=args.top_allocators)
+        runner.run(on_window=lambda summary: print(format_window(summary), flush=True))
+    finally:
+        if report is not None:
+            report.close()
+        session.close()
+    return 1 if runner.drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
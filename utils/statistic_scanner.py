@@ -0,0 +1,281 @@
+"""
+Массовая проверка совпадения статистики v1 и v2 для существующих объявлений.
+
+    python -m utils.statistic_scanner --ids-file ids.txt --concurrency 32 \
+        --report mismatches.jsonl --checkpoint scan.checkpoint
+    python -m utils.statistic_scanner --seller-range 111111 112111 ...
+
+Расхождения дописываются в отчёт построчно (JSON Lines) по мере обнаружения.
+Обработанные id и продавцы пишутся в checkpoint, повторный запуск с тем же
+файлом продолжает с места остановки.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from utils.api_client import APIClient, BASE_URL
+from utils.warmup import create_session
+
+
+def bounded_map(executor, fn, iterable, limit):
+    """
+    Аналог executor.map, который держит в работе не больше limit задач
+    и отдаёт результаты по мере готовности (без сохранения порядка).
+    """
+    pending = set()
+    for arg in iterable:
+        pending.add(executor.submit(fn, arg))
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+class Checkpoint:
+    """Журнал обработанных id и продавцов: по строке "item <id>" / "seller <id>" """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.items = set()
+        self.sellers = set()
+        self._lock = threading.Lock()
+        self._file = None
+        if path is None:
+            return
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    kind, _, value = line.strip().partition(" ")
+                    if kind == "item":
+                        self.items.add(value)
+                    elif kind == "seller":
+                        self.sellers.add(value)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write(self, kind, value):
+        if self._file is not None:
+            self._file.write(f"{kind} {value}\n")
+            self._file.flush()
+
+    def mark_item(self, item_id):
+        with self._lock:
+            self.items.add(item_id)
+            self._write("item", item_id)
+
+    def mark_seller(self, seller_id):
+        with self._lock:
+            self.sellers.add(str(seller_id))
+            self._write("seller", seller_id)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ScanSummary:
+    def __init__(self):
+        self.scanned = 0
+        self.matched = 0
+        self.mismatched = 0
+        self.missing = 0
+        self.errors = 0
+        self.skipped = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+    def lines(self):
+        return [
+            f"scanned {self.scanned} items in {self.elapsed:.2f}s ({self.throughput:.1f} items/s)",
+            f"  matched {self.matched}, mismatched {self.mismatched}, missing {self.missing}, "
+            f"errors {self.errors}, skipped by checkpoint {self.skipped}",
+        ]
+
+
+class StatisticScanner:
+    """
+    Сравнение /api/1/statistic/{id} и /api/2/statistic/{id} для множества id
+    с ограниченным параллелизмом. Обе версии запрашиваются одновременно,
+    чтобы между снимками статистики было как можно меньше времени.
+    """
+
+    def __init__(self, client, concurrency=16, report=None, checkpoint=None):
+        self.client = client
+        self.concurrency = concurrency
+        self.report = report
+        self.checkpoint = checkpoint or Checkpoint()
+        self.summary = ScanSummary()
+        self._report_lock = threading.Lock()
+        self._versions = None
+        # Продавец отмечается в checkpoint, только когда проверены все его id
+        self._seller_pending = {}
+        self._item_seller = {}
+
+    def _fetch(self, item_id, version):
+        try:
+            response = self.client.get_statistic(item_id, version=version)
+        except requests.RequestException as exc:
+            return f"error:{type(exc).__name__}", None
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        return response.status_code, body
+
+    def compare(self, item_id):
+        """Сравнение для одного id: (id, вид результата, запись для отчёта или None)"""
+        if self._versions is not None:
+            v2_future = self._versions.submit(self._fetch, item_id, 2)
+            v1_status, v1_body = self._fetch(item_id, 1)
+            v2_status, v2_body = v2_future.result()
+        else:
+            v1_status, v1_body = self._fetch(item_id, 1)
+            v2_status, v2_body = self._fetch(item_id, 2)
+
+        if isinstance(v1_status, str) or isinstance(v2_status, str):
+            kind = "error"
+        elif v1_status == v2_status == 404:
+            kind = "missing"
+        elif v1_status == v2_status == 200 and v1_body == v2_body:
+            kind = "matched"
+        else:
+            kind = "mismatched"
+        record = None
+        if kind in ("error", "mismatched"):
+            record = {"id": item_id, "kind": kind, "v1_status": v1_status,
+                      "v2_status": v2_status, "v1": v1_body, "v2": v2_body}
+        return item_id, kind, record
+
+    def _emit(self, record):
+        if self.report is None:
+            return
+        with self._report_lock:
+            self.report.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.report.flush()
+
+    def seller_item_ids(self, seller_ids):
+        """id объявлений продавцов из диапазона (через get_seller_items)"""
+        def fetch(seller_id):
+            try:
+                response = self.client.get_seller_items(seller_id)
+            except requests.RequestException as exc:
+                return seller_id, None, f"error:{type(exc).__name__}"
+            if response.status_code != 200:
+                return seller_id, None, response.status_code
+            return seller_id, [item["id"] for item in response.json()], None
+
+        pending = (seller_id for seller_id in seller_ids
+                   if str(seller_id) not in self.checkpoint.sellers)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for seller_id, item_ids, error in bounded_map(executor, fetch, pending, self.concurrency):
+                if error is not None:
+                    self.summary.errors += 1
+                    self._emit({"seller": seller_id, "kind": "error", "status": error})
+                    continue
+                if not item_ids:
+                    self.checkpoint.mark_seller(seller_id)
+                    continue
+                self._seller_pending[seller_id] = set(item_ids)
+                for item_id in item_ids:
+                    self._item_seller[item_id] = seller_id
+                yield from item_ids
+
+    def _done(self, item_id):
+        seller_id = self._item_seller.pop(item_id, None)
+        if seller_id is None:
+            return
+        pending = self._seller_pending[seller_id]
+        pending.discard(item_id)
+        if not pending:
+            del self._seller_pending[seller_id]
+            self.checkpoint.mark_seller(seller_id)
+
+    def scan(self, item_ids):
+        summary = self.summary
+
+        def todo():
+            for item_id in item_ids:
+                if item_id in self.checkpoint.items:
+                    summary.skipped += 1
+                    self._done(item_id)
+                    continue
+                yield item_id
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as versions:
+            self._versions = versions
+            for item_id, kind, record in bounded_map(executor, self.compare, todo(), self.concurrency):
+                summary.scanned += 1
+                counter = "errors" if kind == "error" else kind
+                setattr(summary, counter, getattr(summary, counter) + 1)
+                if record is not None:
+                    self._emit(record)
+                if kind != "error":
+                    # Ошибки не отмечаются, чтобы повторный запуск их перепроверил
+                    self.checkpoint.mark_item(item_id)
+                    self._done(item_id)
+        self._versions = None
+        summary.elapsed = time.perf_counter() - summary.started
+        return summary
+
+
+def read_ids(path):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield line.strip()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Сверка статистики v1 и v2 по множеству объявлений")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ids-file", help="Файл с id объявлений, по одному в строке")
+    source.add_argument("--seller-range", nargs=2, type=int, metavar=("FIRST", "LAST"),
+                        help="Диапазон sellerID (включительно) для обхода через get_seller_items")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--report", default="statistic_mismatches.jsonl",
+                        help="Файл расхождений (JSON Lines, дописывается)")
+    parser.add_argument("--checkpoint", help="Файл прогресса для возобновления")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    session = create_session(pool_size=args.concurrency * 3)
+    client = APIClient(args.base_url, timeout=args.timeout, session=session)
+    checkpoint = Checkpoint(args.checkpoint)
+    with open(args.report, "a", encoding="utf-8") as report:
+        scanner = StatisticScanner(client, args.concurrency, report, checkpoint)
+        if args.ids_file:
+            item_ids = read_ids(args.ids_file)
+        else:
+            first, last = args.seller_range
+            item_ids = scanner.seller_item_ids(range(first, last + 1))
+        try:
+            summary = scanner.scan(item_ids)
+        finally:
+            checkpoint.close()
+            session.close()
+    for line in summary.lines():
+        print(line)
+    return 1 if summary.mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
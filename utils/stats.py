@@ -0,0 +1,9 @@
+import math
+
+
+def quantile(values, q):
+    """Квантиль по отсортированному списку (ближайший ранг)"""
+    if not values:
+        return None
+    index = max(0, math.ceil(q * len(values)) - 1)
+    return values[index]
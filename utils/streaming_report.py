@@ -0,0 +1,332 @@
+"""
+pytest-плагин с потоковыми отчётами для больших прогонов.
+
+    pytest tests/ --stream-junit report.xml --stream-html report/
+
+В отличие от pytest-html и --junitxml результаты не копятся в памяти до конца
+сессии: каждый тест дописывается на диск сразу после teardown. В памяти
+держатся только счётчики и отчёты тестов, которые ещё выполняются.
+
+JUnit XML после каждой записи остаётся корректным документом: закрывающие
+теги дописываются за последним testcase и перезаписываются следующим, а
+счётчики в заголовке testsuite имеют фиксированную ширину и обновляются
+на месте. HTML разбит на страницы по --stream-html-page-size тестов
+и index.html со сводкой; если прогон прерван, уже записанные страницы
+открываются в браузере как есть, а сводка отстаёт не больше чем на секунду.
+"""
+import html
+import os
+import re
+import socket
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+HEADER_WIDTH = 320
+MAX_TEXT = 20000
+OUTCOMES = ("passed", "failed", "error", "skipped", "xfailed", "xpassed")
+JUNIT_CLOSING = b"</testsuite>\n</testsuites>\n"
+# Как часто перезаписывать index.html, секунды: переписывать его после каждого
+# теста на десятках тысяч тестов заметно дороже самой записи строк
+INDEX_INTERVAL = 1.0
+
+# Символы, недопустимые в XML 1.0
+_INVALID_XML = re.compile("[^\u0009\u000a\u000d\u0020-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("stream-report", "Потоковые отчёты")
+    group.addoption("--stream-junit", default=None,
+                    help="Файл JUnit XML, дописываемый после каждого теста")
+    group.addoption("--stream-html", default=None,
+                    help="Каталог для постраничного HTML-отчёта")
+    group.addoption("--stream-html-page-size", type=int, default=500,
+                    help="Сколько тестов выводить на одной HTML-странице")
+
+
+def pytest_configure(config):
+    # В xdist-воркерах отчёты не пишутся: их получает контроллер
+    if hasattr(config, "workerinput"):
+        return
+    if config.getoption("--stream-junit") or config.getoption("--stream-html"):
+        config.pluginmanager.register(StreamingReportPlugin(config), "stream-report-plugin")
+
+
+def _clean(text):
+    text = _INVALID_XML.sub("?", text)
+    if len(text) > MAX_TEXT:
+        text = text[:MAX_TEXT] + f"\n... truncated {len(text) - MAX_TEXT} characters"
+    return text
+
+
+def _split_nodeid(nodeid):
+    """classname и name в стиле --junitxml: tests/test_a.py::TestA::test_b -> tests.test_a.TestA"""
+    parts = nodeid.split("::")
+    module = parts[0]
+    if module.endswith(".py"):
+        module = module[:-3]
+    names = [module.replace("/", ".").replace("\\", ".")] + parts[1:]
+    return ".".join(names[:-1]), names[-1]
+
+
+class CaseResult:
+    """Итог одного теста по отчётам setup/call/teardown"""
+
+    def __init__(self, nodeid, reports):
+        self.nodeid = nodeid
+        self.classname, self.name = _split_nodeid(nodeid)
+        self.duration = sum(getattr(report, "duration", 0.0) for report in reports)
+        self.outcome = "passed"
+        self.message = ""
+        self.details = ""
+        self.stdout = ""
+        for report in reports:
+            if report.when == "call" or (report.when == "setup" and not report.passed):
+                self.stdout = report.capstdout + report.capstderr
+            if hasattr(report, "wasxfail"):
+                self.outcome = "xfailed" if report.skipped else "xpassed"
+                self.message = report.wasxfail
+                continue
+            if report.failed:
+                # Падение в фикстурах - error, как в --junitxml
+                self.outcome = "failed" if report.when == "call" else "error"
+                self.details = report.longreprtext
+                self.message = self.details.strip().splitlines()[-1] if self.details.strip() else ""
+                if report.when != "call":
+                    self.message = f"{report.when} failed: {self.message}"
+                break
+            if report.skipped and self.outcome == "passed":
+                self.outcome = "skipped"
+                if isinstance(report.longrepr, tuple):
+                    self.message = report.longrepr[2]
+                else:
+                    self.message = report.longreprtext
+        self.message = _clean(self.message)
+        self.details = _clean(self.details)
+        self.stdout = _clean(self.stdout)
+
+
+class JUnitStreamWriter:
+    """
+    Дописываемый JUnit XML. Новый testcase пишется поверх закрывающих тегов
+    одной операцией записи вместе с ними, поэтому файл всегда корректен.
+    """
+
+    def __init__(self, path, suite_name="pytest"):
+        self.path = path
+        self.suite_name = suite_name
+        self.counts = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+        self.started = time.time()
+        self.timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.hostname = socket.gethostname()[:64]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(b'<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+        self._header_offset = self._file.tell()
+        self._file.write(self._header())
+        self._tail = self._file.tell()
+        self._file.write(JUNIT_CLOSING)
+        self._file.flush()
+
+    def _header(self):
+        attrs = [("name", self.suite_name)]
+        attrs += [(key, str(value)) for key, value in self.counts.items()]
+        attrs += [("time", f"{time.time() - self.started:.3f}"),
+                  ("timestamp", self.timestamp), ("hostname", self.hostname)]
+        header = "<testsuite " + " ".join(f"{key}={quoteattr(value)}" for key, value in attrs)
+        # Пробелы перед ">" держат ширину заголовка постоянной
+        return (header.ljust(HEADER_WIDTH - 2) + ">\n").encode("utf-8")
+
+    def add(self, case):
+        self.counts["tests"] += 1
+        element = f"<testcase classname={quoteattr(case.classname)} name={quoteattr(case.name)} " \
+                  f'time="{case.duration:.3f}"'
+        body = []
+        if case.outcome == "failed":
+            self.counts["failures"] += 1
+            body.append(f"<failure message={quoteattr(case.message)}>{escape(case.details)}</failure>")
+        elif case.outcome == "error":
+            self.counts["errors"] += 1
+            body.append(f"<error message={quoteattr(case.message)}>{escape(case.details)}</error>")
+        elif case.outcome in ("skipped", "xfailed"):
+            self.counts["skipped"] += 1
+            message = case.message if case.outcome == "skipped" else f"xfail: {case.message}"
+            body.append(f"<skipped message={quoteattr(message)}/>")
+        if case.stdout:
+            body.append(f"<system-out>{escape(case.stdout)}</system-out>")
+        element += (">" + "".join(body) + "</testcase>\n") if body else "/>\n"
+
+        data = element.encode("utf-8")
+        self._file.seek(self._tail)
+        self._file.write(data + JUNIT_CLOSING)
+        self._tail += len(data)
+        self._file.seek(self._header_offset)
+        self._file.write(self._header())
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.seek(self._header_offset)
+            self._file.write(self._header())
+            self._file.close()
+            self._file = None
+
+
+PAGE_STYLE = """<style>
+body { font-family: sans-serif; font-size: 14px; margin: 1em; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ddd; padding: 4px 6px; text-align: left; vertical-align: top; }
+pre { white-space: pre-wrap; margin: 0; }
+.passed { color: #2a7a2a; } .failed, .error, .xpassed { color: #b22222; }
+.skipped, .xfailed { color: #996600; }
+</style>"""
+
+
+class HTMLStreamWriter:
+    """
+    Постраничный HTML: page-0001.html, page-0002.html, ... по page_size тестов
+    и index.html со сводкой по страницам. Строки таблицы дописываются в текущую
+    страницу по мере завершения тестов. index.html атомарно перезаписывается
+    при открытии страницы и не реже раза в INDEX_INTERVAL секунд, поэтому
+    после прерванного прогона сводка отстаёт от страниц не больше чем на
+    INDEX_INTERVAL.
+    """
+
+    def __init__(self, directory, page_size=500, title="pytest report"):
+        self.directory = directory
+        self.page_size = max(1, page_size)
+        self.title = title
+        self.totals = dict.fromkeys(OUTCOMES, 0)
+        self.pages = []
+        self.finished = False
+        self.started = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._file = None
+        self._rows = 0
+        self._index_written = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def page_name(number):
+        return f"page-{number:04d}.html"
+
+    def _open_page(self):
+        number = len(self.pages) + 1
+        self.pages.append(dict.fromkeys(OUTCOMES, 0))
+        self._file = open(os.path.join(self.directory, self.page_name(number)), "w", encoding="utf-8")
+        self._rows = 0
+        self._file.write(
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>{html.escape(self.title)} - page {number}</title>{PAGE_STYLE}</head><body>\n"
+            f"<p>{self._navigation(number)}</p>\n"
+            "<table><thead><tr><th>#</th><th>outcome</th><th>test</th><th>duration, s</th>"
+            "</tr></thead><tbody>\n"
+        )
+        self._file.flush()
+        self.write_index()
+
+    def _navigation(self, number):
+        links = ['<a href="index.html">index</a>']
+        if number > 1:
+            links.append(f'<a href="{self.page_name(number - 1)}">previous</a>')
+        return " | ".join(links)
+
+    def _close_page(self, last):
+        number = len(self.pages)
+        navigation = self._navigation(number)
+        if not last:
+            navigation += f' | <a href="{self.page_name(number + 1)}">next</a>'
+        self._file.write(f"</tbody></table>\n<p>{navigation}</p>\n</body></html>\n")
+        self._file.close()
+        self._file = None
+
+    def add(self, case):
+        if self._file is not None and self._rows >= self.page_size:
+            self._close_page(last=False)
+        if self._file is None:
+            self._open_page()
+        self._rows += 1
+        self.totals[case.outcome] += 1
+        self.pages[-1][case.outcome] += 1
+        index = (len(self.pages) - 1) * self.page_size + self._rows
+        details = ""
+        text = "\n".join(filter(None, (case.message if not case.details else "", case.details,
+                                       case.stdout and "captured output:\n" + case.stdout)))
+        if text:
+            details = f"<details><summary>details</summary><pre>{html.escape(text)}</pre></details>"
+        self._file.write(
+            f'<tr><td>{index}</td><td class="{case.outcome}">{case.outcome}</td>'
+            f"<td>{html.escape(case.nodeid)}{details}</td><td>{case.duration:.3f}</td></tr>\n"
+        )
+        self._file.flush()
+        if time.monotonic() - self._index_written >= INDEX_INTERVAL:
+            self.write_index()
+
+    def write_index(self):
+        status = "finished" if self.finished else "running"
+        totals = ", ".join(f"{outcome} {count}" for outcome, count in self.totals.items() if count)
+        rows = []
+        for number, counts in enumerate(self.pages, 1):
+            cells = "".join(f"<td>{counts[outcome]}</td>" for outcome in OUTCOMES)
+            rows.append(f'<tr><td><a href="{self.page_name(number)}">page {number}</a></td>{cells}</tr>')
+        header = "".join(f"<th>{outcome}</th>" for outcome in OUTCOMES)
+        content = (
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>{html.escape(self.title)}</title>{PAGE_STYLE}</head><body>\n"
+            f"<h1>{html.escape(self.title)}</h1>\n"
+            f"<p>started {self.started}, status: {status}</p>\n"
+            f"<p>{sum(self.totals.values())} tests: {totals or '-'}</p>\n"
+            f"<table><thead><tr><th>page</th>{header}</tr></thead><tbody>\n"
+            + "\n".join(rows) + "\n</tbody></table>\n</body></html>\n"
+        )
+        path = os.path.join(self.directory, "index.html")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+        self._index_written = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self._close_page(last=True)
+        self.finished = True
+        self.write_index()
+
+
+class StreamingReportPlugin:
+    def __init__(self, config):
+        self.config = config
+        self.writers = []
+        junit_path = config.getoption("--stream-junit")
+        html_dir = config.getoption("--stream-html")
+        if junit_path:
+            self.writers.append(JUnitStreamWriter(junit_path))
+        if html_dir:
+            self.writers.append(HTMLStreamWriter(html_dir, config.getoption("--stream-html-page-size")))
+        # Отчёты только тех тестов, у которых ещё не было teardown
+        self._running = {}
+
+    def pytest_runtest_logreport(self, report):
+        reports = self._running.setdefault(report.nodeid, [])
+        reports.append(report)
+        if report.when == "teardown":
+            self._write(CaseResult(report.nodeid, self._running.pop(report.nodeid)))
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self._write(CaseResult(report.nodeid or "collection", [report]))
+
+    def _write(self, case):
+        for writer in self.writers:
+            writer.add(case)
+
+    def pytest_sessionfinish(self, session):
+        for writer in self.writers:
+            writer.close()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        for writer in self.writers:
+            if isinstance(writer, JUnitStreamWriter):
+                terminalreporter.write_sep("-", f"streaming junit xml: {os.path.abspath(writer.path)}")
+            else:
+                index = os.path.join(os.path.abspath(writer.directory), "index.html")
+                terminalreporter.write_sep("-", f"streaming html report: {index}")
@@ -0,0 +1,181 @@
+import gzip
+import json
+import re
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+
+from utils.compression import brotli
+from utils.http_server import BackgroundServer
+
+ITEM_ROUTE = re.compile(r"^/api/(?P<version>\d+)/item/(?P<id>[^/]+)$")
+SELLER_ROUTE = re.compile(r"^/api/1/(?P<seller_id>[^/]+)/item$")
+STATISTIC_ROUTE = re.compile(r"^/api/(?P<version>\d+)/statistic/(?P<id>[^/]+)$")
+STATISTIC_FIELDS = ("likes", "viewCount", "contacts")
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _validate_item(data):
+    """Проверка тела POST /api/1/item по правилам swagger"""
+    if not isinstance(data, dict):
+        return False
+    if not isinstance(data.get("sellerID"), int) or isinstance(data.get("sellerID"), bool):
+        return False
+    if not isinstance(data.get("name"), str) or not data["name"]:
+        return False
+    if not isinstance(data.get("price"), int) or data["price"] < 0:
+        return False
+    statistics = data.get("statistics")
+    if not isinstance(statistics, dict):
+        return False
+    return all(isinstance(statistics.get(field), int) for field in STATISTIC_FIELDS)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _encode(self, body):
+        """Сжатие ответа по Accept-Encoding, если заглушка запущена с compression=True"""
+        if not self.server.owner.compression:
+            return body, None
+        accepted = [value.strip() for value in self.headers.get("Accept-Encoding", "").split(",")]
+        if "br" in accepted and brotli is not None:
+            return brotli.compress(body), "br"
+        if "gzip" in accepted:
+            return gzip.compress(body), "gzip"
+        if "deflate" in accepted:
+            return zlib.compress(body), "deflate"
+        return body, None
+
+    def _send_json(self, status, payload):
+        body, encoding = self._encode(json.dumps(payload).encode("utf-8"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self):
+        self._send_json(404, {"result": {"message": "not found"}, "status": "404"})
+
+    def _bad_request(self):
+        self._send_json(400, {"result": {"message": "bad request"}, "status": "400"})
+
+    def do_POST(self):
+        service = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path != "/api/1/item":
+            return self._not_found()
+        try:
+            data = json.loads(raw or b"null")
+        except ValueError:
+            return self._bad_request()
+        if not _validate_item(data):
+            return self._bad_request()
+        item = service.add_item(data)
+        if service.status_response:
+            return self._send_json(200, {"status": f"Сохранили объявление - {item['id']}"})
+        self._send_json(200, item)
+
+    def do_GET(self):
+        service = self.server.owner
+        match = ITEM_ROUTE.match(self.path)
+        if match and match.group("version") == "1":
+            if not _is_uuid(match.group("id")):
+                return self._bad_request()
+            item = service.get_item(match.group("id"))
+            return self._send_json(200, [item]) if item else self._not_found()
+
+        match = SELLER_ROUTE.match(self.path)
+        if match:
+            seller_id = match.group("seller_id")
+            if not seller_id.isdigit() or int(seller_id) <= 0:
+                return self._bad_request()
+            return self._send_json(200, service.get_seller_items(int(seller_id)))
+
+        match = STATISTIC_ROUTE.match(self.path)
+        if match and match.group("version") in ("1", "2"):
+            if not _is_uuid(match.group("id")):
+                if match.group("version") == "1":
+                    return self._bad_request()
+                return self._not_found()
+            statistics = service.get_statistic(match.group("id"), int(match.group("version")))
+            return self._send_json(200, [statistics]) if statistics else self._not_found()
+
+        self._not_found()
+
+    def do_DELETE(self):
+        service = self.server.owner
+        match = ITEM_ROUTE.match(self.path)
+        if not match or match.group("version") != "2":
+            return self._not_found()
+        if not _is_uuid(match.group("id")):
+            return self._bad_request()
+        if not service.delete_item(match.group("id")):
+            return self._not_found()
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class StubItemService(BackgroundServer):
+    """
+    Локальная заглушка сервиса объявлений с хранением в памяти.
+    Повторяет контракт эндпоинтов, которые использует APIClient, и позволяет
+    гонять инструменты (прокси, мониторинг, сравнение сборок) без сети.
+    """
+
+    handler_class = _StubHandler
+
+    def __init__(self, host="127.0.0.1", port=0, compression=False, status_response=False):
+        super().__init__(host, port)
+        self.compression = compression
+        # Ответ на создание, как у реального сервиса (BUGS.md #8): только status с id в тексте
+        self.status_response = status_response
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def add_item(self, data):
+        item = {
+            "id": str(uuid.uuid4()),
+            "sellerId": data["sellerID"],
+            "name": data["name"],
+            "price": data["price"],
+            "statistics": {field: data["statistics"][field] for field in STATISTIC_FIELDS},
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self._items[item["id"]] = item
+        return item
+
+    def get_item(self, item_id):
+        with self._lock:
+            return self._items.get(item_id)
+
+    def get_statistic(self, item_id, version):
+        item = self.get_item(item_id)
+        return item["statistics"] if item else None
+
+    def get_seller_items(self, seller_id):
+        with self._lock:
+            return [item for item in self._items.values() if item["sellerId"] == seller_id]
+
+    def delete_item(self, item_id):
+        with self._lock:
+            return self._items.pop(item_id, None) is not None
@@ -0,0 +1,279 @@
+import os
+import socket
+import ssl
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_DNS_TTL = 300
+DEFAULT_WARMUP_TIMEOUT = 10.0
+
+
+class DNSCache:
+    """
+    Кэш результатов socket.getaddrinfo с TTL.
+    install() подменяет socket.getaddrinfo в процессе, поэтому urllib3
+    перестаёт резолвить хост на каждое новое соединение.
+    """
+
+    def __init__(self, ttl=DEFAULT_DNS_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._original = None
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        resolve = self._original or socket.getaddrinfo
+        result = resolve(host, port, family, type, proto, flags)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+        return list(result)
+
+    def install(self):
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+
+
+class _SessionTrackingSocket(ssl.SSLSocket):
+    """SSLSocket, который перед закрытием отдаёт свою TLS-сессию контексту"""
+
+    def _real_close(self):
+        self.context.remember_session(self)
+        super()._real_close()
+
+
+class SessionReusingContext(ssl.SSLContext):
+    """
+    SSLContext, который переиспользует TLS-сессию (session ticket) при новых
+    соединениях к тому же хосту, и повторный хендшейк становится сокращённым.
+    """
+
+    def __new__(cls, protocol=ssl.PROTOCOL_TLS_CLIENT, *args, **kwargs):
+        return super().__new__(cls, protocol)
+
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT, verify=True):
+        super().__init__()
+        if verify is False:
+            self.check_hostname = False
+            self.verify_mode = ssl.CERT_NONE
+        elif isinstance(verify, str) and os.path.isdir(verify):
+            self.load_verify_locations(capath=verify)
+        else:
+            self.load_verify_locations(verify if isinstance(verify, str) else requests.certs.where())
+        self.sslsocket_class = _SessionTrackingSocket
+        self._sessions = {}
+        self._sockets = {}
+        self._session_lock = threading.Lock()
+
+    def remember_session(self, sock):
+        session = sock.session if not sock.server_side else None
+        if session is not None and session.has_ticket and sock.server_hostname:
+            with self._session_lock:
+                self._sessions[sock.server_hostname] = session
+
+    def _cached_session(self, server_hostname):
+        # В TLS 1.3 тикет приходит уже после хендшейка, поэтому актуальную
+        # сессию забираем у живых сокетов в момент нового подключения
+        with self._session_lock:
+            sockets = [ref() for ref in self._sockets.get(server_hostname, [])]
+            self._sockets[server_hostname] = [weakref.ref(sock) for sock in sockets if sock is not None]
+        for sock in sockets:
+            if sock is not None:
+                self.remember_session(sock)
+        with self._session_lock:
+            return self._sessions.get(server_hostname)
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True,
+                    suppress_ragged_eofs=True, server_hostname=None, session=None):
+        if session is None and not server_side and server_hostname:
+            session = self._cached_session(server_hostname)
+        sslsock = super().wrap_socket(
+            sock, server_side=server_side, do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs, server_hostname=server_hostname,
+            session=session,
+        )
+        if not server_side and server_hostname:
+            with self._session_lock:
+                self._sockets.setdefault(server_hostname, []).append(weakref.ref(sslsock))
+        return sslsock
+
+
+class WarmPoolAdapter(HTTPAdapter):
+    """
+    HTTPAdapter с SessionReusingContext для HTTPS-пулов. urllib3 подстраивает
+    контекст под параметры соединения (verify_mode, ca_certs), поэтому у каждого
+    значения verify свой контекст и свои пулы: verify=False и другой CA-файл
+    не меняют контекст остальных запросов.
+    """
+
+    def __init__(self, ssl_context=None, **kwargs):
+        self.ssl_context = ssl_context or SessionReusingContext()
+        self._contexts = {True: self.ssl_context}
+        self._contexts_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def context_for(self, verify):
+        with self._contexts_lock:
+            context = self._contexts.get(verify)
+            if context is None:
+                context = self._contexts[verify] = SessionReusingContext(verify=verify)
+            return context
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if host_params["scheme"] == "https":
+            pool_kwargs["ssl_context"] = self.context_for(True if verify is None else verify)
+        return host_params, pool_kwargs
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+def create_session(pool_size=10, ssl_context=None):
+    """requests.Session с пулом нужного размера и переиспользованием TLS-сессий"""
+    session = requests.Session()
+    adapter = WarmPoolAdapter(ssl_context=ssl_context, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class WarmupReport:
+    """Результаты прогрева: тайминги фаз в секундах и число открытых соединений"""
+
+    def __init__(self, base_url, connections):
+        self.base_url = base_url
+        self.requested_connections = connections
+        self.dns_seconds = None
+        self.first_request_seconds = None
+        self.connect_seconds = None
+        self.total_seconds = None
+        self.opened_connections = 0
+        self.tls_resumed = 0
+        self.error = None
+
+    def lines(self):
+        if self.error:
+            return [f"warm-up of {self.base_url} failed after "
+                    f"{self.total_seconds or 0:.3f}s: {self.error}"]
+
+        def ms(seconds):
+            return "-" if seconds is None else f"{seconds * 1000:.1f}ms"
+
+        return [
+            f"warm-up of {self.base_url}: total {ms(self.total_seconds)}",
+            f"  dns: {ms(self.dns_seconds)}, first request: {ms(self.first_request_seconds)}, "
+            f"extra connections: {ms(self.connect_seconds)}",
+            f"  pooled connections: {self.opened_connections}/{self.requested_connections}, "
+            f"tls sessions resumed: {self.tls_resumed}",
+        ]
+
+
+class ConnectionWarmer:
+    """
+    Прогрев соединений к base_url:
+    резолв DNS (через DNSCache), первый запрос для полного TLS-хендшейка
+    и получения тикета, затем параллельное открытие остальных соединений пула
+    с возобновлением TLS-сессии.
+    timeout ограничивает первый запрос и открытие каждого соединения.
+    """
+
+    def __init__(self, session, base_url, connections=4, dns_cache=None,
+                 timeout=DEFAULT_WARMUP_TIMEOUT):
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.connections = connections
+        self.dns_cache = dns_cache
+        self.timeout = timeout
+        self.report = WarmupReport(self.base_url, connections)
+
+    @property
+    def max_duration(self):
+        """Сколько ждать прогрев целиком: первый запрос и параллельное открытие соединений"""
+        return self.timeout * 3
+
+    def wait(self, thread):
+        """Ожидание фонового прогрева не дольше max_duration; зависший прогрев попадает в отчёт"""
+        thread.join(self.max_duration)
+        if thread.is_alive():
+            self.report.total_seconds = self.max_duration
+            self.report.error = "timed out, tests continue with a cold pool"
+
+    def _pool(self):
+        # Пул берём так же, как его берёт requests при отправке запроса,
+        # иначе прогретые соединения окажутся в другом пуле
+        request = requests.Request("GET", self.base_url).prepare()
+        settings = self.session.merge_environment_settings(request.url, {}, None, None, None)
+        adapter = self.session.get_adapter(request.url)
+        return adapter.get_connection_with_tls_context(
+            request, settings["verify"], settings["proxies"], settings["cert"]
+        )
+
+    def run(self):
+        report = self.report
+        started = time.perf_counter()
+        try:
+            parts = urlsplit(self.base_url)
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            resolve = self.dns_cache.getaddrinfo if self.dns_cache else socket.getaddrinfo
+            phase = time.perf_counter()
+            resolve(parts.hostname, port, 0, socket.SOCK_STREAM)
+            report.dns_seconds = time.perf_counter() - phase
+
+            phase = time.perf_counter()
+            self.session.head(self.base_url, allow_redirects=False, timeout=self.timeout)
+            report.first_request_seconds = time.perf_counter() - phase
+            report.opened_connections = 1
+
+            if self.connections > 1:
+                phase = time.perf_counter()
+                pool = self._pool()
+                conns = [pool._get_conn() for _ in range(self.connections)]
+                fresh = [conn for conn in conns if conn.sock is None]
+                for conn in fresh:
+                    conn.timeout = self.timeout
+                try:
+                    with ThreadPoolExecutor(max_workers=len(fresh) or 1) as executor:
+                        list(executor.map(lambda conn: conn.connect(), fresh))
+                finally:
+                    report.opened_connections = sum(1 for conn in conns if conn.sock is not None)
+                    report.tls_resumed = sum(
+                        1 for conn in fresh
+                        if conn.sock is not None and getattr(conn.sock, "session_reused", False)
+                    )
+                    for conn in conns:
+                        pool._put_conn(conn)
+                report.connect_seconds = time.perf_counter() - phase
+        except Exception as exc:
+            report.error = f"{type(exc).__name__}: {exc}"
+        report.total_seconds = time.perf_counter() - started
+        return report